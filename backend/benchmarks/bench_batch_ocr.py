@@ -0,0 +1,56 @@
+"""
+基准: 批量识别吞吐量(张/秒)随批大小的变化
+
+每张门卡包含一张名称裁剪图与一张价格裁剪图, 批大小为1时等价于逐张调用
+用法: python bench_batch_ocr.py <名称截图目录> <价格截图目录> [重复次数]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ocr_utils import OcrEngines
+
+BATCH_SIZES = [1, 2, 4, 8, 16]
+
+
+def load_crops(directory: Path):
+    return [np.asarray(Image.open(path).convert("L")) for path in sorted(directory.glob("*.png"))]
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        return 1
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    names = load_crops(Path(sys.argv[1]))
+    prices = load_crops(Path(sys.argv[2]))
+    if not names or not prices:
+        print("目录中没有PNG截图")
+        return 1
+
+    engines = OcrEngines()
+    for lang in ("ch", "en"):
+        engines.configure(lang, use_angle_cls=False, rec_batch_num=max(BATCH_SIZES))
+        engines.recognize_batch(lang, names[:1] if lang == "ch" else prices[:1])  # 预热
+
+    for batch_size in BATCH_SIZES:
+        cards = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for i in range(0, max(len(names), len(prices)), batch_size):
+                name_batch = [names[j % len(names)] for j in range(i, i + batch_size)]
+                price_batch = [prices[j % len(prices)] for j in range(i, i + batch_size)]
+                engines.recognize_batch("ch", name_batch)
+                engines.recognize_batch("en", price_batch)
+                cards += batch_size
+        elapsed = time.perf_counter() - start
+        print(f"批大小 {batch_size:>2} | {cards / elapsed:7.1f} 张/秒 | 每张 {elapsed / cards * 1000:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+基准: 对比原两遍PIL回调二值化与查找表二值化在不同区域尺寸下的耗时
+
+用法: python bench_binarize.py [重复次数]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from image_utils import binarize, PRICE_THRESHOLD
+
+SIZES = [(49, 43), (141, 43), (320, 120), (640, 360), (1920, 1080)]
+
+
+def two_pass(screenshot, threshold):
+    """原实现: 灰度 -> point(lambda) -> eval(lambda)"""
+    gray_image = screenshot.convert('L')
+    binary_image = gray_image.point(lambda p: 255 if p > threshold else 0)
+    binary_image = Image.eval(binary_image, lambda x: 255 - x)
+    return np.asarray(binary_image)
+
+
+def lut(screenshot, threshold):
+    """新实现: 截图后端返回的RGB数组 + 查找表"""
+    return binarize(screenshot, threshold)
+
+
+def bench(func, screenshot, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(screenshot, PRICE_THRESHOLD)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    for width, height in SIZES:
+        data = np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+        screenshot = Image.fromarray(data, mode="RGB")
+        # 灰度转换与PIL逐像素一致, 差异应为0
+        mismatch = np.mean(two_pass(screenshot, PRICE_THRESHOLD) != lut(data, PRICE_THRESHOLD))
+        runs = max(1, repeat * 49 * 43 // (width * height))
+        old_ms = bench(two_pass, screenshot, runs)
+        new_ms = bench(lut, data, runs)
+        print(f"{width}x{height} | 两遍回调: {old_ms:.3f} ms | 查找表: {new_ms:.3f} ms | 加速: {old_ms / new_ms:.1f}x | 差异像素: {mismatch:.4%}")
+
+
+if __name__ == "__main__":
+    main()
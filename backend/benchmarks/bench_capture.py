@@ -0,0 +1,52 @@
+"""
+基准: 各截图后端的截图吞吐量
+
+用法: python bench_capture.py [回放目录] [每个区域的截图次数]
+未提供回放目录时跳过replay后端
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from capture import BACKENDS, ReplayCapture, create_capture_backend
+
+REGIONS = {
+    "价格区域": (956, 213, 49, 43),
+    "名称区域": (715, 295, 141, 43),
+    "详情面板": (600, 150, 700, 500),
+}
+
+
+def bench(backend, region, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        backend.grab(region)
+    elapsed = time.perf_counter() - start
+    return count / elapsed, elapsed / count * 1000
+
+
+def main():
+    replay_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    for name in BACKENDS:
+        if name == ReplayCapture.name and not replay_dir:
+            continue
+        try:
+            backend = create_capture_backend(name, replay_dir=replay_dir, auto_advance=True)
+        except Exception as e:
+            print(f"{name}: 无法创建 ({e})")
+            continue
+        if backend.name != name:
+            print(f"{name}: 依赖未安装, 跳过")
+            backend.close()
+            continue
+        for label, region in REGIONS.items():
+            fps, ms = bench(backend, region, count)
+            print(f"{name:<10} | {label} {region[2]}x{region[3]} | {fps:8.1f} 次/秒 | {ms:.3f} ms/次")
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+基准: 门卡定位器在录制整屏截图上的耗时与命中情况
+
+分别测量无位置缓存(整个网格区域多尺度搜索)与有位置缓存(优先在上次位置附近搜索)两种情况
+用法: python bench_card_locator.py <整屏截图目录> [模板目录]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from card_locator import CardLocator, DEFAULT_TEMPLATES_DIR
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    frames = [np.asarray(Image.open(path).convert("RGB")) for path in sorted(Path(sys.argv[1]).glob("*.png"))]
+    templates_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_TEMPLATES_DIR
+    locator = CardLocator(templates_dir)
+    names = list(locator.templates)
+    if not frames or not names:
+        print("缺少截图或模板")
+        return 1
+
+    for label, keep_cache in (("无缓存", False), ("有缓存", True)):
+        locator.last_known.clear()
+        latencies, found = [], 0
+        for frame in frames:
+            if not keep_cache:
+                locator.last_known.clear()
+            start = time.perf_counter()
+            found += len(locator.locate(frame, names))
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(
+            f"{label} | 截图数: {len(frames)} | 模板数: {len(names)} | "
+            f"找到: {found}/{len(frames) * len(names)} | "
+            f"p50: {np.percentile(latencies, 50):.2f} ms | p95: {np.percentile(latencies, 95):.2f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+微基准: 对比OCR前"保存PNG再读回"与"直接传递内存数组"两种方式的每次检查耗时
+
+用法: python bench_inmemory_ocr.py [重复次数]
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+SCRIPT_FILE = Path(__file__).resolve()
+BASE_DIR = SCRIPT_FILE.parent.parent.parent
+CONFIG_FILE = BASE_DIR / "config" / "config.json"
+
+
+def load_regions():
+    """读取配置中的区域尺寸, 缺失时使用默认值"""
+    try:
+        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        config = {}
+    regions = {}
+    for key, default in (("card_name_range", [0, 0, 141, 43]), ("card_price_range", [0, 0, 49, 43])):
+        region = config.get(key) or default
+        regions[key] = (int(region[2]), int(region[3]))
+    return regions
+
+
+def make_binary_image(width, height):
+    """生成与二值化截图相同格式的随机图像"""
+    data = (np.random.rand(height, width) > 0.5).astype(np.uint8) * 255
+    return Image.fromarray(data, mode="L")
+
+
+def png_round_trip(image, path):
+    """旧流程: 编码并写入PNG, 再由OCR读取解码"""
+    image.save(path)
+    return np.array(Image.open(path).convert("RGB"))
+
+
+def in_memory(image):
+    """新流程: 直接转换为数组"""
+    return np.asarray(image)
+
+
+def bench(func, *args, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        for key, (width, height) in load_regions().items():
+            image = make_binary_image(width, height)
+            path = Path(tmp) / f"{key}.png"
+            old_ms = bench(png_round_trip, image, path, repeat=repeat)
+            new_ms = bench(in_memory, image, repeat=repeat)
+            print(
+                f"{key} ({width}x{height}) | "
+                f"PNG往返: {old_ms:.3f} ms | "
+                f"内存数组: {new_ms:.3f} ms | "
+                f"每次节省: {old_ms - new_ms:.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+基准: 对比"检测+方向分类+识别"与"仅识别"两种PaddleOCR流程在录制截图上的端到端延迟
+
+用法: python bench_ocr_modes.py <名称截图目录> <价格截图目录> [重复次数]
+目录中的PNG可通过配置 save_ocr_images 或 digit_ocr.collect_samples 收集
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ocr_utils import recognize
+
+
+def load_crops(directory: Path):
+    return [np.asarray(Image.open(path).convert("L")) for path in sorted(directory.glob("*.png"))]
+
+
+def bench(engine, crops, rec_only, cls, repeat):
+    latencies = []
+    texts = []
+    for _ in range(repeat):
+        for crop in crops:
+            start = time.perf_counter()
+            result = recognize(engine, crop, rec_only=rec_only, cls=cls)
+            latencies.append((time.perf_counter() - start) * 1000)
+            texts.append(result[0] if result else None)
+    return latencies, texts
+
+
+def report(label, latencies):
+    print(
+        f"{label} | p50: {np.percentile(latencies, 50):.2f} ms | "
+        f"p95: {np.percentile(latencies, 95):.2f} ms | 平均: {np.mean(latencies):.2f} ms"
+    )
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        return 1
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    from paddleocr import PaddleOCR
+    engines = {
+        "名称": (PaddleOCR(use_angle_cls=True, lang='ch'), load_crops(Path(sys.argv[1])), True),
+        "价格": (PaddleOCR(use_angle_cls=True, lang='en'), load_crops(Path(sys.argv[2])), False),
+    }
+    for label, (engine, crops, cls) in engines.items():
+        if not crops:
+            print(f"{label}: 目录中没有PNG截图")
+            continue
+        # 预热, 排除首次推理的初始化开销
+        recognize(engine, crops[0], rec_only=False, cls=cls)
+        recognize(engine, crops[0], rec_only=True)
+
+        full, full_texts = bench(engine, crops, False, cls, repeat)
+        rec, rec_texts = bench(engine, crops, True, False, repeat)
+        report(f"{label} 检测+识别", full)
+        report(f"{label} 仅识别  ", rec)
+        agree = np.mean([a == b for a, b in zip(full_texts, rec_texts)])
+        print(f"{label} 两种模式结果一致率: {agree:.2%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+基准: 启动耗时对比
+
+分别在独立子进程中测量:
+1. 原实现: 导入时构建中文与英文两个完整PaddleOCR模型
+2. 现实现: 导入main模块(不加载任何模型)
+3. 现实现: 按需构建仅识别模式的中文模型(数字模板可用时的唯一模型)
+
+用法: python bench_startup.py
+"""
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+CASES = {
+    "原实现 导入时加载两个模型": (
+        "from paddleocr import PaddleOCR\n"
+        "PaddleOCR(use_angle_cls=True, lang='ch')\n"
+        "PaddleOCR(use_angle_cls=True, lang='en')\n"
+    ),
+    "现实现 导入main模块": "import main\n",
+    "现实现 按需加载中文模型": (
+        "from ocr_utils import OcrEngines\n"
+        "engines = OcrEngines()\n"
+        "engines.configure('ch', use_angle_cls=False)\n"
+        "engines.get('ch')\n"
+    ),
+}
+
+
+def run(code):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    return elapsed, result.returncode, result.stderr.strip().splitlines()[-1:]
+
+
+def main():
+    for label, code in CASES.items():
+        elapsed, code, error = run(code)
+        status = f"{elapsed:.2f} 秒" if code == 0 else f"失败: {error}"
+        print(f"{label}: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+离线评估数字识别器的准确率与延迟
+
+用法:
+    python eval_digit_ocr.py <样本目录>             # 偶数序号样本训练, 奇数序号样本评估
+    python eval_digit_ocr.py <训练目录> <评估目录>
+    加 --paddle 参数同时测量PaddleOCR在相同样本上的延迟作为对照
+"""
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from digit_ocr import DigitRecognizer, iter_labelled_samples
+
+
+def split_samples(samples_dir: Path, tmp: Path):
+    """将单个样本目录按序号拆分为训练集与评估集"""
+    train_dir, eval_dir = tmp / "train", tmp / "eval"
+    train_dir.mkdir()
+    eval_dir.mkdir()
+    for i, path in enumerate(sorted(samples_dir.glob("*.png"))):
+        shutil.copy(path, (train_dir if i % 2 == 0 else eval_dir) / path.name)
+    return train_dir, eval_dir
+
+
+def evaluate(recognizer, samples, paddle=None):
+    correct = fallback = wrong = 0
+    latencies, paddle_latencies = [], []
+    for label, binary in samples:
+        start = time.perf_counter()
+        price, _ = recognizer.recognize(binary)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if price is None:
+            fallback += 1
+        elif str(price) == label:
+            correct += 1
+        else:
+            wrong += 1
+            print(f"识别错误: 标签 {label}, 识别结果 {price}")
+        if paddle is not None:
+            start = time.perf_counter()
+            paddle.ocr(binary, cls=False)
+            paddle_latencies.append((time.perf_counter() - start) * 1000)
+
+    total = len(samples)
+    print(f"样本数: {total} | 正确: {correct} | 回退: {fallback} | 错误: {wrong}")
+    if total:
+        print(f"准确率(不含回退): {correct / max(1, correct + wrong):.2%} | 回退率: {fallback / total:.2%}")
+        print(f"数字识别器延迟 p50: {np.percentile(latencies, 50):.3f} ms | p95: {np.percentile(latencies, 95):.3f} ms")
+    if paddle_latencies:
+        print(f"PaddleOCR延迟 p50: {np.percentile(paddle_latencies, 50):.3f} ms | p95: {np.percentile(paddle_latencies, 95):.3f} ms")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not args:
+        print(__doc__)
+        return 1
+
+    paddle = None
+    if "--paddle" in sys.argv:
+        from paddleocr import PaddleOCR
+        paddle = PaddleOCR(use_angle_cls=True, lang='en')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(args) == 1:
+            train_dir, eval_dir = split_samples(Path(args[0]), Path(tmp))
+        else:
+            train_dir, eval_dir = Path(args[0]), Path(args[1])
+
+        recognizer = DigitRecognizer.train(train_dir)
+        if recognizer is None:
+            return 1
+        evaluate(recognizer, list(iter_labelled_samples(eval_dir)), paddle)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+回放: 用录制的场景离线运行完整的 price_check_flow, 统计决策准确率, 吞吐量与延迟
+
+截图由回放后端从场景目录读取, 点击与按键由记录型输入后端接收(不操作真实鼠标键盘),
+无需游戏与桌面即可运行, 每次优化后可用同一批场景对比结果。
+
+场景目录结构(每个场景一个子目录):
+    scenarios/
+      场景名/
+        scenario.json   {"card": "门卡名称", "buy": true, "key": {...可选, 覆盖config中该门卡的配置}}
+        0.png           点击门卡前的整屏画面
+        1.png           门卡详情面板打开后的整屏画面
+点击门卡时切换到 1.png, 按下 esc 时切回 0.png。所有场景需为同一分辨率。
+
+用法: python replay_flow.py <场景目录> [--config config.json] [--repeat 1] [--verbose]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import main as bot
+from capture import ReplayCapture
+from cards import compile_cards
+from input_backend import RecordingInput
+
+DEFAULT_CONFIG = Path(__file__).resolve().parents[2] / "config" / "config.json"
+
+
+def load_scenarios(root: Path) -> List[Dict[str, Any]]:
+    scenarios = []
+    for path in sorted(p for p in root.iterdir() if (p / "scenario.json").exists()):
+        with open(path / "scenario.json", "r", encoding="utf-8") as f:
+            scenario = json.load(f)
+        scenario["dir"] = path
+        scenarios.append(scenario)
+    return scenarios
+
+
+def build_config(config_path: Path, scenarios: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """在原配置基础上关闭会写入真实文件的功能, 并加入场景中的门卡配置"""
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config["price_store"] = {"enabled": False}
+    config.setdefault("digit_ocr", {})["collect_samples"] = False
+    config["save_ocr_images"] = False
+    keys = {key["name"]: key for key in config.get("keys", [])}
+    for scenario in scenarios:
+        key = dict(keys.get(scenario["card"], {}), **scenario.get("key", {}), name=scenario["card"])
+        key["want_buy"] = 1
+        keys[scenario["card"]] = key
+    config["keys"] = list(keys.values())
+    return config
+
+
+def run_scenario(processor: "bot.CardProcessor", scenario: Dict[str, Any]) -> Dict[str, Any]:
+    replay = ReplayCapture(scenario["dir"])
+
+    def on_click(position) -> None:
+        if replay.index == 0:
+            replay.index = 1  # 打开详情面板
+
+    def on_press(key: str) -> None:
+        if key == "esc":
+            replay.index = 0
+
+    recorder = RecordingInput(on_click=on_click, on_press=on_press)
+    bot.capture_backend = replay
+    bot.input_backend = recorder
+    # 截图器与就绪检测器持有截图后端, 每个场景重新创建
+    processor.grabber = None
+    processor.waiter = None
+    processor.panel_signature = None
+
+    card = processor.cards.resolve(scenario["card"])
+    start = time.perf_counter()
+    bought = processor.price_check_flow(card)
+    elapsed = time.perf_counter() - start
+    return {
+        "name": scenario["dir"].name,
+        "expected": bool(scenario.get("buy", False)),
+        "bought": bought,
+        "elapsed": elapsed,
+        "events": [(action, args) for _, action, args in recorder.events],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线回放完整价格检查流程")
+    parser.add_argument("scenarios", type=Path, help="场景目录")
+    parser.add_argument("--config", type=Path, default=DEFAULT_CONFIG)
+    parser.add_argument("--repeat", type=int, default=1, help="重复运行整批场景的次数(后几轮可命中缓存)")
+    parser.add_argument("--verbose", action="store_true", help="输出流程中的调试信息")
+    args = parser.parse_args()
+
+    scenarios = load_scenarios(args.scenarios)
+    if not scenarios:
+        print(__doc__)
+        return 1
+    config = build_config(args.config, scenarios)
+
+    first = ReplayCapture(scenarios[0]["dir"])
+    bot.screen_width, bot.screen_height = first.size()
+    bot.migrate_config(config, first.size())
+    bot.is_debug = args.verbose
+    bot.is_loop = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 日志, 缓存与统计写入临时目录, 不影响实际运行的记录
+        tmp = Path(tmp)
+        bot.LOGS_FILE = tmp / "logs.txt"
+        bot.AUDIT_FILE = tmp / "audit.jsonl"
+        bot.NAME_CACHE_FILE = tmp / "name_cache.json"
+        bot.METRICS_FILE = tmp / "metrics.json"
+
+        processor = bot.CardProcessor(config, compile_cards(config))
+        results = []
+        try:
+            wall_start = time.perf_counter()
+            for _ in range(args.repeat):
+                for scenario in scenarios:
+                    if ReplayCapture(scenario["dir"]).size() != (bot.screen_width, bot.screen_height):
+                        print(f"跳过分辨率不一致的场景: {scenario['dir'].name}")
+                        continue
+                    results.append(run_scenario(processor, scenario))
+            wall = time.perf_counter() - wall_start
+        finally:
+            processor.close()
+
+    if not results:
+        return 1
+    correct = sum(r["bought"] == r["expected"] for r in results)
+    false_buys = [r["name"] for r in results if r["bought"] and not r["expected"]]
+    missed = [r["name"] for r in results if r["expected"] and not r["bought"]]
+    latencies = np.array([r["elapsed"] * 1000 for r in results])
+    print(f"决策准确率: {correct}/{len(results)} ({correct / len(results):.1%})")
+    print(f"  误购买: {len(false_buys)} {sorted(set(false_buys))}")
+    print(f"  漏购买: {len(missed)} {sorted(set(missed))}")
+    print(f"吞吐量: {len(results) / wall:.2f} 场景/秒")
+    print(
+        f"单次流程耗时(ms) p50: {np.percentile(latencies, 50):.1f} | "
+        f"p95: {np.percentile(latencies, 95):.1f} | 最大: {latencies.max():.1f}"
+    )
+    return 0 if not false_buys and not missed else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
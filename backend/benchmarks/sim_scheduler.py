@@ -0,0 +1,152 @@
+"""
+模拟: 用录制的价格序列回放轮询过程, 比较轮流检查与自适应调度发现低价的延迟
+
+价格序列来自价格观测记录库(prices.db), 门卡阈值与调度参数来自 config.json;
+没有记录库时使用 --synthetic 生成随机游走价格。每次检查耗时固定为 --cycle 秒,
+某时刻的价格取该时刻之前最近一次观测值。低价窗口(价格低于最高可接受价格的连续时段)开始后
+第一次检查到该门卡的时间差即为发现延迟, 窗口结束前未检查到则计为错过。
+
+用法: python sim_scheduler.py [--db prices.db] [--config config.json] [--cycle 1.0] [--synthetic]
+"""
+import argparse
+import bisect
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cards import CardRecord, compile_cards
+from price_store import PriceStore, DEFAULT_DB_FILE
+from scheduler import PollScheduler
+
+DEFAULT_CONFIG = Path(__file__).resolve().parents[2] / "config" / "config.json"
+
+Trace = Tuple[List[float], List[int]]  # (时间戳, 价格), 时间从0开始
+
+
+def load_traces(db: Path, cards: List[CardRecord]) -> Dict[str, Trace]:
+    store = PriceStore(db)
+    try:
+        rows = {card.name: store.last_n(card.name, 1_000_000)[::-1] for card in cards}
+    finally:
+        store.close()
+    rows = {name: r for name, r in rows.items() if r}
+    if not rows:
+        return {}
+    start = min(r[0][0] for r in rows.values())
+    return {name: ([row[0] - start for row in r], [row[2] for row in r]) for name, r in rows.items()}
+
+
+def synthetic_traces(cards: List[CardRecord], duration: float, seed: int) -> Dict[str, Trace]:
+    """每张门卡一条对数随机游走价格, 起点在阈值上方的不同距离"""
+    rng = np.random.default_rng(seed)
+    traces = {}
+    for i, card in enumerate(cards):
+        times = np.arange(0.0, duration, 1.0)
+        start = card.max_price * (1.02 + 0.3 * i / max(1, len(cards) - 1))
+        walk = np.cumsum(rng.normal(0, 0.004, len(times)))
+        traces[card.name] = (times.tolist(), (start * np.exp(walk)).astype(int).tolist())
+    return traces
+
+
+def price_at(trace: Trace, t: float) -> int:
+    times, prices = trace
+    return prices[max(0, bisect.bisect_right(times, t) - 1)]
+
+
+def deal_windows(trace: Trace, max_price: float, end: float) -> List[Tuple[float, float]]:
+    """价格低于阈值的连续时段"""
+    windows = []
+    start = None
+    for t, price in zip(*trace):
+        if price < max_price and start is None:
+            start = t
+        elif price >= max_price and start is not None:
+            windows.append((start, t))
+            start = None
+    if start is not None:
+        windows.append((start, end))
+    return windows
+
+
+def simulate(cards: List[CardRecord], traces: Dict[str, Trace], scheduler_config: Dict,
+             cycle: float, duration: float) -> Dict[str, float]:
+    now = 0.0
+    scheduler = PollScheduler.from_config(cards, scheduler_config, clock=lambda: now)
+    polls: Dict[str, List[float]] = {card.name: [] for card in cards}
+    while now < duration:
+        due = scheduler.pop_due()
+        if not due:
+            now += scheduler.time_until_due()
+            continue
+        card = due[0]
+        polls[card.name].append(now)
+        scheduler.observe(card, price_at(traces[card.name], now))
+        now += cycle
+        scheduler.reschedule(card)
+
+    latencies, missed = [], 0
+    for card in cards:
+        times = polls[card.name]
+        for start, end in deal_windows(traces[card.name], card.max_price, duration):
+            i = bisect.bisect_left(times, start)
+            if i < len(times) and times[i] < end:
+                latencies.append(times[i] - start)
+            else:
+                missed += 1
+    return {
+        "polls": sum(len(t) for t in polls.values()),
+        "deals": len(latencies) + missed,
+        "found": len(latencies),
+        "p50": float(np.percentile(latencies, 50)) if latencies else float("nan"),
+        "p95": float(np.percentile(latencies, 95)) if latencies else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回放价格序列比较轮询策略")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_FILE)
+    parser.add_argument("--config", type=Path, default=DEFAULT_CONFIG)
+    parser.add_argument("--cycle", type=float, default=1.0, help="每次检查耗时(秒)")
+    parser.add_argument("--synthetic", action="store_true", help="使用随机游走价格代替录制记录")
+    parser.add_argument("--duration", type=float, default=3600.0, help="随机游走价格的时长(秒)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    cards = compile_cards(config).wanted
+    if args.synthetic:
+        traces = synthetic_traces(cards, args.duration, args.seed)
+    elif args.db.exists():
+        traces = load_traces(args.db, cards)
+    else:
+        traces = {}
+    cards = [card for card in cards if card.name in traces]
+    if not cards:
+        print("没有可回放的价格记录, 可使用 --synthetic")
+        return 1
+    duration = max(times[-1] for times, _ in traces.values()) + args.cycle
+
+    policies = {
+        "轮流检查": {"min_interval": 0.0, "max_interval": 0.0},
+        "自适应调度": config.get("scheduler", {}),
+    }
+    for label, policy in policies.items():
+        start = time.perf_counter()
+        result = simulate(cards, traces, policy, args.cycle, duration)
+        print(
+            f"{label} | 门卡: {len(cards)} | 检查次数: {result['polls']} | "
+            f"发现低价: {result['found']}/{result['deals']} | "
+            f"延迟 p50: {result['p50']:.1f} s | p95: {result['p95']:.1f} s | "
+            f"模拟耗时: {time.perf_counter() - start:.2f} s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
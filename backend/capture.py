@@ -0,0 +1,181 @@
+"""
+屏幕截图后端
+
+所有后端返回RGB格式的uint8数组, region格式与pyautogui一致: (left, top, width, height)
+- mss: 基于系统原生截图接口(Windows GDI / Linux X11 共享内存), 速度最快
+- pyautogui: 原有实现, 作为兼容后备
+- replay: 从录制的PNG目录读取整屏画面并裁剪, 无需游戏即可运行整个流程
+"""
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+Region = Tuple[int, int, int, int]
+
+
+class CaptureBackend:
+    """截图后端基类"""
+
+    name = "base"
+
+    def grab(self, region: Region) -> np.ndarray:
+        """截取指定区域, 返回RGB数组"""
+        raise NotImplementedError
+
+    def grab_screen(self) -> np.ndarray:
+        """截取整个屏幕"""
+        width, height = self.size()
+        return self.grab((0, 0, width, height))
+
+    def size(self) -> Tuple[int, int]:
+        """屏幕尺寸(宽, 高)"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class PyAutoGuiCapture(CaptureBackend):
+    """pyautogui截图(原有实现)"""
+
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+
+    def grab(self, region: Region) -> np.ndarray:
+        return np.asarray(self._pyautogui.screenshot(region=region))
+
+    def size(self) -> Tuple[int, int]:
+        return tuple(self._pyautogui.size())
+
+
+class MssCapture(CaptureBackend):
+    """mss截图, 每个线程持有独立的mss实例(mss实例不可跨线程使用)"""
+
+    name = "mss"
+
+    def __init__(self):
+        import mss
+        self._mss = mss
+        self._local = threading.local()
+        self._instances: List = []
+        self._lock = threading.Lock()
+
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = self._mss.mss()
+            self._local.sct = sct
+            with self._lock:
+                self._instances.append(sct)
+        return sct
+
+    def grab(self, region: Region) -> np.ndarray:
+        left, top, width, height = region
+        shot = self._sct().grab({"left": left, "top": top, "width": width, "height": height})
+        return cv2.cvtColor(np.asarray(shot), cv2.COLOR_BGRA2RGB)
+
+    def size(self) -> Tuple[int, int]:
+        monitor = self._sct().monitors[1]
+        return monitor["width"], monitor["height"]
+
+    def close(self) -> None:
+        with self._lock:
+            for sct in self._instances:
+                sct.close()
+            self._instances.clear()
+
+
+class ReplayCapture(CaptureBackend):
+    """
+    回放录制的整屏PNG画面
+
+    auto_advance为True时每次grab后切换到下一帧, 否则需调用advance()切换,
+    便于将帧切换与点击等操作对应起来。播放到末尾后从头循环。
+    """
+
+    name = "replay"
+
+    def __init__(self, frames_dir: Path, auto_advance: bool = False):
+        paths = sorted(Path(frames_dir).glob("*.png"))
+        if not paths:
+            raise FileNotFoundError(f"回放目录 {frames_dir} 中没有PNG画面")
+        self.frames = [np.asarray(Image.open(path).convert("RGB")) for path in paths]
+        self.auto_advance = auto_advance
+        self.index = 0
+
+    @property
+    def frame(self) -> np.ndarray:
+        return self.frames[self.index]
+
+    def advance(self) -> None:
+        self.index = (self.index + 1) % len(self.frames)
+
+    def grab(self, region: Region) -> np.ndarray:
+        left, top, width, height = region
+        crop = self.frame[top:top + height, left:left + width]
+        if self.auto_advance:
+            self.advance()
+        return crop
+
+    def size(self) -> Tuple[int, int]:
+        height, width = self.frame.shape[:2]
+        return width, height
+
+
+class MultiRegionGrabber:
+    """
+    一次截取覆盖所有区域的外接矩形, 各区域作为该帧的切片视图返回(零拷贝)
+
+    既减少截图调用次数, 又保证各区域来自同一帧画面
+    """
+
+    def __init__(self, backend: CaptureBackend, regions: Dict[str, Region]):
+        if not regions:
+            raise ValueError("至少需要一个区域")
+        self.backend = backend
+        left = min(r[0] for r in regions.values())
+        top = min(r[1] for r in regions.values())
+        right = max(r[0] + r[2] for r in regions.values())
+        bottom = max(r[1] + r[3] for r in regions.values())
+        self.bounding_region: Region = (left, top, right - left, bottom - top)
+        # 预先计算各区域在外接矩形内的切片
+        self.slices = {
+            key: (slice(y - top, y - top + h), slice(x - left, x - left + w))
+            for key, (x, y, w, h) in regions.items()
+        }
+
+    def grab(self) -> Dict[str, np.ndarray]:
+        """截取一帧并返回 {区域名: 区域图像视图}"""
+        frame = self.backend.grab(self.bounding_region)
+        return {key: frame[rows, cols] for key, (rows, cols) in self.slices.items()}
+
+
+BACKENDS = {
+    MssCapture.name: MssCapture,
+    PyAutoGuiCapture.name: PyAutoGuiCapture,
+    ReplayCapture.name: ReplayCapture,
+}
+
+
+def create_capture_backend(name: str = "mss", replay_dir: Optional[str] = None, auto_advance: bool = False) -> CaptureBackend:
+    """按名称创建截图后端, mss不可用时回退到pyautogui"""
+    if name == ReplayCapture.name:
+        if not replay_dir:
+            raise ValueError("replay后端需要配置replay_dir")
+        return ReplayCapture(Path(replay_dir), auto_advance=auto_advance)
+    if name not in BACKENDS:
+        logging.warning(f"未知的截图后端 {name}, 使用pyautogui")
+        name = PyAutoGuiCapture.name
+    try:
+        return BACKENDS[name]()
+    except ImportError:
+        logging.warning(f"截图后端 {name} 依赖未安装, 使用pyautogui")
+        return PyAutoGuiCapture()
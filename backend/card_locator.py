@@ -0,0 +1,119 @@
+"""
+门卡定位器
+
+在整屏截图中用多尺度模板匹配查找各门卡的图标, 一次截图即可得到所有门卡的位置,
+代替固定的 position 比例坐标。每张门卡记录上次找到的位置与尺度, 下次优先在其附近搜索。
+参考图标存放在模板目录中, 文件名为门卡名称, 如 "card_templates/某某门卡.png"。
+"""
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from image_utils import to_gray
+
+Region = Tuple[int, int, int, int]
+
+DEFAULT_TEMPLATES_DIR = Path(__file__).parent.resolve() / "card_templates"
+
+
+class CardLocator:
+    """基于多尺度模板匹配的门卡定位器"""
+
+    def __init__(
+        self,
+        templates_dir: Path = DEFAULT_TEMPLATES_DIR,
+        grid_region: Optional[Region] = None,
+        scales: Iterable[float] = (0.9, 1.0, 1.1),
+        threshold: float = 0.8,
+        search_margin: float = 1.0,
+    ):
+        self.grid_region = tuple(grid_region) if grid_region else None
+        self.threshold = threshold
+        self.search_margin = search_margin  # 附近搜索范围(模板尺寸的倍数)
+        # 预先生成各尺度的灰度模板: {名称: [(尺度, 模板)]}
+        self.templates: Dict[str, List[Tuple[float, np.ndarray]]] = {}
+        for path in sorted(Path(templates_dir).glob("*.png")):
+            gray = to_gray(np.asarray(Image.open(path).convert("RGB")))
+            self.templates[path.stem] = [
+                (scale, cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA))
+                for scale in scales
+            ]
+        # 上次找到的位置: {名称: (中心x, 中心y, 尺度)}
+        self.last_known: Dict[str, Tuple[int, int, float]] = {}
+
+    def has_template(self, name: str) -> bool:
+        return name in self.templates
+
+    @staticmethod
+    def _match(area: np.ndarray, template: np.ndarray) -> Tuple[float, Tuple[int, int]]:
+        if area.shape[0] < template.shape[0] or area.shape[1] < template.shape[1]:
+            return -1.0, (0, 0)
+        result = cv2.matchTemplate(area, template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, location = cv2.minMaxLoc(result)
+        return score, location
+
+    def _search_near(self, gray: np.ndarray, name: str) -> Optional[Tuple[int, int, float]]:
+        """在上次位置附近以上次尺度搜索"""
+        if name not in self.last_known:
+            return None
+        cx, cy, last_scale = self.last_known[name]
+        for scale, template in self.templates[name]:
+            if scale != last_scale:
+                continue
+            th, tw = template.shape
+            mx, my = int(tw * (0.5 + self.search_margin)), int(th * (0.5 + self.search_margin))
+            x1, y1 = max(0, cx - mx), max(0, cy - my)
+            area = gray[y1:cy + my, x1:cx + mx]
+            score, (x, y) = self._match(area, template)
+            if score >= self.threshold:
+                return x1 + x + tw // 2, y1 + y + th // 2, scale
+        return None
+
+    def _search_full(self, gray: np.ndarray, name: str, offset: Tuple[int, int]) -> Optional[Tuple[int, int, float]]:
+        """在整个网格区域内多尺度搜索, 返回得分最高的匹配"""
+        best = None
+        best_score = self.threshold
+        for scale, template in self.templates[name]:
+            score, (x, y) = self._match(gray, template)
+            if score >= best_score:
+                th, tw = template.shape
+                best_score = score
+                best = offset[0] + x + tw // 2, offset[1] + y + th // 2, scale
+        return best
+
+    def locate(self, screen: np.ndarray, names: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+        """在整屏截图中查找门卡, 返回 {名称: (中心x, 中心y)} (屏幕像素坐标), 未找到的门卡不包含在结果中"""
+        gray = to_gray(screen)
+        if self.grid_region:
+            gx, gy, gw, gh = self.grid_region
+            grid, offset = gray[gy:gy + gh, gx:gx + gw], (gx, gy)
+        else:
+            grid, offset = gray, (0, 0)
+
+        positions = {}
+        for name in names:
+            if name not in self.templates:
+                continue
+            found = self._search_near(gray, name) or self._search_full(grid, name, offset)
+            if found is None:
+                self.last_known.pop(name, None)
+                logging.warning(f"未在画面中找到门卡 {name}")
+                continue
+            self.last_known[name] = found
+            positions[name] = found[:2]
+        return positions
+
+
+def save_template(screen: np.ndarray, center: Tuple[int, int], size: Tuple[int, int], name: str,
+                  templates_dir: Path = DEFAULT_TEMPLATES_DIR) -> Path:
+    """以center为中心从整屏截图中裁剪参考图标并保存"""
+    width, height = size
+    x1, y1 = max(0, center[0] - width // 2), max(0, center[1] - height // 2)
+    templates_dir.mkdir(parents=True, exist_ok=True)
+    path = templates_dir / f"{name}.png"
+    Image.fromarray(np.ascontiguousarray(screen[y1:y1 + height, x1:x1 + width])).save(path)
+    return path
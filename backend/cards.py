@@ -0,0 +1,86 @@
+"""
+门卡配置编译
+
+启动时将配置中的 keys 编译为带 __slots__ 的门卡记录, 预先计算购买阈值,
+并建立 名称 -> 门卡 的哈希索引, 识别到的名称可在O(1)时间内找到对应门卡。
+默认只接受精确匹配; 配置 name_match_cutoff < 1 时允许模糊匹配, 但数字不同的名称(例如不同房间号)
+永远不会被模糊匹配到一起。匹配结果会被记住, 下次同样的识别结果直接命中。
+"""
+import difflib
+import re
+from typing import Any, Dict, List, Optional
+
+MAX_RESOLVED = 4096  # 识别结果记忆的上限, 超出后清空重新积累
+_DIGITS = re.compile(r"\d+")
+
+
+class CardRecord:
+    """编译后的门卡配置"""
+
+    __slots__ = ("name", "ideal_price", "floating_percentage_range", "max_price", "want_buy")
+
+    def __init__(self, card: Dict[str, Any]):
+        self.name: str = card.get("name", "")
+        self.ideal_price: int = card.get("ideal_price", 0)
+        self.floating_percentage_range: float = card.get("floating_percentage_range", 0.1)
+        self.max_price: float = self.ideal_price + (self.ideal_price * self.floating_percentage_range)
+        self.want_buy: bool = card.get("want_buy", 0) == 1
+
+    def premium(self, price: int) -> float:
+        """溢价率(%)"""
+        return ((price / self.ideal_price) - 1) * 100
+
+    def __repr__(self) -> str:
+        return f"CardRecord({self.name!r}, max_price={self.max_price})"
+
+
+class CardIndex:
+    """门卡名称索引"""
+
+    def __init__(self, cards: List[CardRecord], fuzzy_cutoff: float = 1.0):
+        self.cards = cards
+        self.fuzzy_cutoff = fuzzy_cutoff  # 模糊匹配的最低相似度, 大于等于1时仅精确匹配
+        # 索引键与识别结果做相同的处理(去除空格)
+        self.by_name: Dict[str, CardRecord] = {}
+        for card in cards:
+            key = normalize_name(card.name)
+            if key in self.by_name:
+                raise ValueError(f"门卡名称重复: {self.by_name[key].name!r} 与 {card.name!r}")
+            self.by_name[key] = card
+        # 识别结果 -> 门卡 的记忆(包括模糊匹配与未匹配的结果)
+        self._resolved: Dict[str, Optional[CardRecord]] = dict(self.by_name)
+
+    @property
+    def wanted(self) -> List[CardRecord]:
+        return [card for card in self.cards if card.want_buy]
+
+    def resolve(self, recognized: str) -> Optional[CardRecord]:
+        """根据识别到的名称查找门卡(忽略空格), 找不到时返回None"""
+        try:
+            return self._resolved[recognized]
+        except KeyError:
+            pass
+        if len(self._resolved) > MAX_RESOLVED:
+            self._resolved = dict(self.by_name)
+        name = normalize_name(recognized)
+        card = self.by_name.get(name)
+        if card is None and self.fuzzy_cutoff < 1:
+            # 只在数字完全相同的名称之间模糊匹配, 避免把 302 识别结果匹配到 301
+            digits = _DIGITS.findall(name)
+            candidates = [key for key in self.by_name if _DIGITS.findall(key) == digits]
+            matches = difflib.get_close_matches(name, candidates, n=1, cutoff=self.fuzzy_cutoff)
+            if matches:
+                card = self.by_name[matches[0]]
+        self._resolved[recognized] = card
+        return card
+
+
+def normalize_name(name: str) -> str:
+    """去除名称中的空格和空白字符"""
+    return name.replace(" ", "").strip()
+
+
+def compile_cards(config: Dict[str, Any]) -> CardIndex:
+    """编译配置中的门卡列表"""
+    cards = [CardRecord(card) for card in config.get("keys", [])]
+    return CardIndex(cards, fuzzy_cutoff=config.get("name_match_cutoff", 1.0))
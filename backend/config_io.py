@@ -0,0 +1,94 @@
+"""
+配置文件读写
+
+写入时先写到同目录下的临时文件并刷新到磁盘, 再通过 os.replace 原子替换原文件,
+写入过程中程序退出或其他进程同时读取时, 不会看到写了一半的配置。
+ConfigWatcher 轮询配置文件的修改时间, 供运行中的主程序在校准后热加载配置。
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+def save_json_atomic(path: Path, data: Dict[str, Any], indent: int = 2) -> None:
+    """原子写入JSON文件"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ConfigWatcher:
+    """
+    轮询配置文件的修改时间, 文件变化并稳定 debounce 秒后重新读取
+
+    稳定等待用于合并短时间内的多次写入, 也避免读到仍以非原子方式写入中的文件
+    """
+
+    def __init__(self, path: Path, interval: float = 1.0, debounce: float = 0.3):
+        self.path = Path(path)
+        self.interval = interval
+        self.debounce = debounce
+        self._stamp = self._stat()
+        self._pending: Optional[Tuple[int, int]] = None
+        self._pending_since = 0.0
+        self._next_check = 0.0
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def mark_current(self) -> None:
+        """本进程写入配置后调用, 避免重新加载自己写入的内容"""
+        self._stamp = self._stat()
+        self._pending = None
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """检查配置文件, 有新内容时返回解析后的配置, 否则返回None"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return None
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            self._pending = None
+            self._next_check = now + self.interval
+            return None
+        if stamp != self._pending:
+            # 刚发现变化, 等待文件稳定
+            self._pending = stamp
+            self._pending_since = now
+            self._next_check = now + self.debounce
+            return None
+        if now - self._pending_since < self.debounce:
+            self._next_check = self._pending_since + self.debounce
+            return None
+        self._next_check = now + self.interval
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"重新读取配置失败, 保留当前配置: {e}")
+            self._stamp = stamp  # 文件再次修改前不再重试
+            self._pending = None
+            return None
+        self._stamp = stamp
+        self._pending = None
+        return config
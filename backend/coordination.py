@@ -0,0 +1,116 @@
+"""
+多实例协同
+
+协调模式下 coordinator.py 为每个虚拟显示器/虚拟机启动一个 main.py 工作进程, 每个进程只负责
+门卡列表中的一个分片, 使用各自的截图与输入后端。所有工作进程把购买记录写入同一个SQLite数据库,
+购买前先在数据库中登记(同一事务内检查已购数量), 保证同一张门卡的购买数量不会超过配额。
+价格观测记录(price_store)默认也写入同一个数据库。
+
+购买记录按运行批次(session)区分, 配额只在同一批次内计算: coordinator.py 每次启动生成新的批次ID
+并传给所有工作进程, 上一次运行的购买记录不会影响本次运行。调试模式不点击购买, 也不登记。
+
+注意: SQLite 依赖文件锁, 多台虚拟机共享时请将数据库放在支持文件锁的共享目录中。
+"""
+import secrets
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence, Set
+
+from cards import CardRecord
+
+DEFAULT_STORE_FILE = Path(__file__).parent.resolve() / "shared.db"
+BUSY_TIMEOUT_MS = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS purchases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    card TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    price INTEGER,
+    session TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_purchases_session_card ON purchases (session, card);
+"""
+
+
+def new_session_id() -> str:
+    """生成新的运行批次ID"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(4)}"
+
+
+def shard_cards(cards: Sequence[CardRecord], shard: int, shards: int) -> List[CardRecord]:
+    """
+    按名称排序后轮流分配, 返回第 shard 个分片(从0开始)。
+    各进程读取同一份配置即可得到互不重叠且覆盖全部门卡的分片, 与 keys 的书写顺序无关
+    """
+    if shards <= 1:
+        return list(cards)
+    if not 0 <= shard < shards:
+        raise ValueError(f"分片序号 {shard} 超出范围 0..{shards - 1}")
+    ordered = sorted(cards, key=lambda card: card.name)
+    mine = {card.name for card in ordered[shard::shards]}
+    return [card for card in cards if card.name in mine]
+
+
+class SharedStore:
+    """多个工作进程共享的购买记录, 只读写 session 批次内的记录"""
+
+    def __init__(self, path: Path = DEFAULT_STORE_FILE, session: str = ""):
+        self.path = Path(path)
+        self.session = session
+        # isolation_level=None: 由 claim_purchase 显式控制事务
+        self._conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT_MS / 1000,
+                                     isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def claim_purchase(self, card: str, worker: str, price: Optional[int] = None, quota: int = 1) -> bool:
+        """
+        登记一次购买, 该门卡在本批次的已购数量达到配额时返回False(其他实例已购买, 不应再点击购买)
+
+        BEGIN IMMEDIATE 在读取前即取得写锁, 多个进程同时登记时只有配额内的能成功
+        """
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                (bought,) = conn.execute(
+                    "SELECT COUNT(*) FROM purchases WHERE session = ? AND card = ?", (self.session, card)
+                ).fetchone()
+                if bought >= quota:
+                    conn.execute("COMMIT")
+                    return False
+                conn.execute(
+                    "INSERT INTO purchases (ts, card, worker, price, session) VALUES (?, ?, ?, ?, ?)",
+                    (time.time(), card, worker, price, self.session),
+                )
+                conn.execute("COMMIT")
+                return True
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def purchased_cards(self, quota: int = 1) -> Set[str]:
+        """本批次已达到购买配额的门卡"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT card FROM purchases WHERE session = ? GROUP BY card HAVING COUNT(*) >= ?",
+                (self.session, quota),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def purchases(self) -> List[tuple]:
+        """本批次的全部购买记录 (时间, 门卡, 工作进程, 价格)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT ts, card, worker, price FROM purchases WHERE session = ? ORDER BY ts", (self.session,)
+            ).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,72 @@
+"""
+协调模式启动器
+
+按 config.json 中 coordination.workers 的数量启动多个 main.py 工作进程, 第 i 个进程负责第 i 个门卡分片,
+并使用该项 env 中的环境变量(例如各自的 DISPLAY 虚拟显示器)。工作进程全部退出后输出本次的购买记录。
+每次启动生成新的运行批次ID(--session)传给所有工作进程, 购买配额只在本次运行内计算。
+多台虚拟机部署时无需本脚本, 在每台机器上运行 python main.py --shard i --shards N --session <同一批次ID> 即可。
+
+用法: python coordinator.py [--workers N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from coordination import SharedStore, DEFAULT_STORE_FILE, new_session_id
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+CONFIG_PATH = (SCRIPT_DIR / "../config/config.json").resolve()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动多个分片工作进程")
+    parser.add_argument("--workers", type=int, help="工作进程数量, 默认为 coordination.workers 的数量")
+    args = parser.parse_args()
+
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    coordination = config.get("coordination", {})
+    if not coordination.get("enabled", False):
+        print("请先在配置中启用 coordination.enabled")
+        return 1
+    workers = coordination.get("workers", [])
+    count = args.workers or len(workers)
+    if count < 1:
+        print("没有可启动的工作进程")
+        return 1
+
+    session = new_session_id()
+    print(f"运行批次: {session}")
+    processes = []
+    for shard in range(count):
+        env = dict(os.environ)
+        if shard < len(workers):
+            env.update({k: str(v) for k, v in workers[shard].get("env", {}).items()})
+        cmd = [sys.executable, str(SCRIPT_DIR / "main.py"), "--shard", str(shard), "--shards", str(count),
+               "--session", session]
+        processes.append(subprocess.Popen(cmd, cwd=SCRIPT_DIR, env=env))
+        print(f"已启动分片 {shard + 1}/{count} (pid {processes[-1].pid})")
+
+    try:
+        for process in processes:
+            process.wait()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+    store = SharedStore(Path(coordination.get("store") or DEFAULT_STORE_FILE), session)
+    try:
+        for ts, card, worker, price in store.purchases():
+            print(f"购买记录 | 门卡: {card} | 实例: {worker} | 价格: {price}")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+轻量级价格数字识别器
+
+价格区域只包含游戏固定字体的数字(可能带千位分隔符), 无需完整的PaddleOCR检测+识别流程。
+本模块对二值化图像按连通域切分字符, 将每个字符归一化后与0-9模板做归一化互相关匹配,
+置信度不足时返回None, 由调用方回退到PaddleOCR。
+
+模板从标注样本目录学习: 文件名以价格数字开头, 如 "128000_20250101-120000.png"。
+用法: python digit_ocr.py <样本目录> [模板输出路径]
+"""
+import logging
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from image_utils import build_binarize_lut, to_gray, PRICE_THRESHOLD
+
+GLYPH_HEIGHT = 16  # 归一化字符高度
+GLYPH_WIDTH = 12  # 归一化字符宽度
+MIN_GLYPH_RATIO = 0.5  # 高度低于最高字符该比例的连通块视为分隔符
+MIN_GLYPH_PIXELS = 3  # 少于该像素数的连通块视为噪点
+
+DEFAULT_TEMPLATES_PATH = Path(__file__).parent.resolve() / "digit_templates.npz"
+
+
+def _to_binary(image: np.ndarray) -> np.ndarray:
+    """确保输入为白底黑字的二值数组, 未二值化的原始截图按价格阈值处理"""
+    gray = to_gray(image)
+    if np.isin(gray, (0, 255)).all():
+        return gray
+    return build_binarize_lut(PRICE_THRESHOLD)[gray]
+
+
+def segment_glyphs(binary: np.ndarray) -> List[np.ndarray]:
+    """按连通域切分字符, 去除分隔符与噪点, 返回每个字符的前景掩码"""
+    foreground = (binary == 0).astype(np.uint8)
+    # 4连通, 避免分隔符与相邻数字仅在对角处接触时被连成一块
+    count, _, stats, _ = cv2.connectedComponentsWithStats(foreground, connectivity=4)
+
+    # 按x坐标排序, 合并横向大部分重叠的连通域(同一字符断开的笔画)
+    boxes: List[List[int]] = []
+    for x, y, w, h, area in sorted(stats[1:count].tolist()):
+        if area < MIN_GLYPH_PIXELS:
+            continue
+        if boxes and boxes[-1][2] - x > min(w, boxes[-1][2] - boxes[-1][0]) / 2:
+            box = boxes[-1]
+            box[1], box[2], box[3] = min(box[1], y), max(box[2], x + w), max(box[3], y + h)
+        else:
+            boxes.append([x, y, x + w, y + h])
+    if not boxes:
+        return []
+
+    max_height = max(y2 - y1 for _, y1, _, y2 in boxes)
+    return [
+        foreground[y1:y2, x1:x2]
+        for x1, y1, x2, y2 in boxes
+        if y2 - y1 >= max_height * MIN_GLYPH_RATIO
+    ]
+
+
+def normalize_glyph(glyph: np.ndarray) -> np.ndarray:
+    """按比例补齐宽度后最近邻缩放到固定尺寸, 返回零均值单位长度向量"""
+    height, width = glyph.shape
+    min_width = int(np.ceil(height * GLYPH_WIDTH / GLYPH_HEIGHT))
+    if width < min_width:
+        pad = min_width - width
+        glyph = np.pad(glyph, ((0, 0), (pad // 2, pad - pad // 2)))
+        width = min_width
+
+    row_idx = (np.arange(GLYPH_HEIGHT) * height // GLYPH_HEIGHT)
+    col_idx = (np.arange(GLYPH_WIDTH) * width // GLYPH_WIDTH)
+    vector = glyph[row_idx[:, None], col_idx].astype(np.float32).ravel()
+    vector -= vector.mean()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class DigitRecognizer:
+    """基于模板匹配的数字识别器"""
+
+    def __init__(self, templates: np.ndarray, min_confidence: float = 0.8):
+        # templates: (10, GLYPH_HEIGHT * GLYPH_WIDTH), 第i行为数字i的模板
+        self.templates = templates
+        self.min_confidence = min_confidence
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_TEMPLATES_PATH, min_confidence: float = 0.8) -> Optional["DigitRecognizer"]:
+        """从模板文件加载, 文件不存在或格式错误时返回None"""
+        try:
+            with np.load(path) as data:
+                templates = data["templates"]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"加载数字模板失败: {str(e)}")
+            return None
+        return cls(templates, min_confidence)
+
+    @classmethod
+    def train(cls, samples_dir: Path, min_confidence: float = 0.8) -> Optional["DigitRecognizer"]:
+        """从标注样本目录学习模板, 任一数字缺少样本时返回None"""
+        sums = np.zeros((10, GLYPH_HEIGHT * GLYPH_WIDTH), dtype=np.float32)
+        counts = np.zeros(10, dtype=np.int64)
+        for label, binary in iter_labelled_samples(samples_dir):
+            glyphs = segment_glyphs(binary)
+            if len(glyphs) != len(label):
+                logging.warning(f"样本 {label} 切分出 {len(glyphs)} 个字符, 已跳过")
+                continue
+            for digit, glyph in zip(label, glyphs):
+                sums[int(digit)] += normalize_glyph(glyph)
+                counts[int(digit)] += 1
+
+        missing = [str(d) for d in range(10) if counts[d] == 0]
+        if missing:
+            logging.warning(f"数字 {', '.join(missing)} 缺少样本, 无法生成模板")
+            return None
+        templates = sums / counts[:, None]
+        templates /= np.linalg.norm(templates, axis=1, keepdims=True)
+        return cls(templates, min_confidence)
+
+    def save(self, path: Path = DEFAULT_TEMPLATES_PATH) -> None:
+        """保存模板文件"""
+        np.savez_compressed(path, templates=self.templates)
+
+    def recognize(self, image: np.ndarray) -> Tuple[Optional[int], float]:
+        """识别价格, 返回(价格, 置信度); 置信度不足时价格为None"""
+        glyphs = segment_glyphs(_to_binary(image))
+        if not glyphs:
+            return None, 0.0
+
+        vectors = np.stack([normalize_glyph(glyph) for glyph in glyphs])
+        scores = vectors @ self.templates.T
+        digits = scores.argmax(axis=1)
+        confidence = float(scores.max(axis=1).min())
+        if confidence < self.min_confidence:
+            return None, confidence
+        return int(''.join(map(str, digits))), confidence
+
+
+def iter_labelled_samples(samples_dir: Path):
+    """遍历样本目录, 生成(数字标签, 二值图像)"""
+    for path in sorted(Path(samples_dir).glob("*.png")):
+        label = path.stem.split("_")[0]
+        if not label.isdigit():
+            continue
+        image = np.asarray(Image.open(path).convert("RGB"))
+        yield label, _to_binary(image)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python digit_ocr.py <样本目录> [模板输出路径]")
+        return 1
+    output = Path(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_TEMPLATES_PATH
+    recognizer = DigitRecognizer.train(Path(sys.argv[1]))
+    if recognizer is None:
+        return 1
+    recognizer.save(output)
+    print(f"数字模板已保存到: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
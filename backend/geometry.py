@@ -0,0 +1,106 @@
+"""
+分辨率无关的界面几何模型
+
+配置中的像素区域(*_range)以 reference_resolution 为基准记录, 门卡位置与购买按钮以屏幕比例记录。
+启动时按当前屏幕尺寸一次性换算为像素坐标, 运行中直接查表, 不再做计算与校验。
+
+缩放方式 scale_mode:
+- stretch: 横纵方向分别按比例缩放(界面随屏幕拉伸)
+- height: 按高度等比缩放并水平居中(宽屏下界面保持比例、两侧留空)
+"""
+import logging
+from typing import Any, Dict, Sequence, Tuple
+
+Region = Tuple[int, int, int, int]
+Point = Tuple[int, int]
+
+CONFIG_VERSION = 2  # 引入 reference_resolution 的配置版本
+
+
+class Geometry:
+    """预先计算的当前屏幕像素坐标"""
+
+    def __init__(self, config: Dict[str, Any], screen_size: Tuple[int, int]):
+        screen_width, screen_height = screen_size
+        ref_width, ref_height = config.get("reference_resolution") or screen_size
+        self.reference_size = (ref_width, ref_height)
+        if config.get("scale_mode", "stretch") == "height":
+            self.scale_x = self.scale_y = screen_height / ref_height
+            self.offset_x = (screen_width - ref_width * self.scale_x) / 2
+        else:
+            self.scale_x, self.scale_y = screen_width / ref_width, screen_height / ref_height
+            self.offset_x = 0.0
+
+        # 所有有效区域
+        self.regions: Dict[str, Region] = {}
+        for key, value in config.items():
+            if key.endswith("_range") and isinstance(value, list) and len(value) == 4:
+                self.regions[key] = self.scale_region(value)
+
+        # 门卡点击位置(按名称索引)
+        self.positions: Dict[str, Point] = {}
+        for card in config.get("keys", []):
+            position = card.get("position")
+            if not position or len(position) != 2:
+                logging.error(f"门卡 {card.get('name')} 的position配置无效")
+                continue
+            self.positions[card.get("name")] = self.scale_fraction(position)
+
+        # 购买按钮位置(默认值: 屏幕宽度82.5%, 高度86%)
+        self.purchase_button = self.scale_fraction(config.get("purchase_btn_location", [0.825, 0.86]))
+
+    def scale_point(self, x: float, y: float) -> Point:
+        """参考分辨率下的像素坐标 -> 当前屏幕像素坐标"""
+        return round(x * self.scale_x + self.offset_x), round(y * self.scale_y)
+
+    def scale_fraction(self, fraction: Sequence[float]) -> Point:
+        """参考分辨率下的屏幕比例 -> 当前屏幕像素坐标"""
+        return self.scale_point(fraction[0] * self.reference_size[0], fraction[1] * self.reference_size[1])
+
+    def scale_region(self, region: Sequence[int]) -> Region:
+        """参考分辨率下的像素区域 -> 当前屏幕像素区域"""
+        x, y, w, h = region
+        left, top = self.scale_point(x, y)
+        return left, top, max(1, round(w * self.scale_x)), max(1, round(h * self.scale_y))
+
+
+def to_reference_region(config: Dict[str, Any], region: Sequence[int], screen_size: Tuple[int, int]) -> list:
+    """将当前屏幕上选取的像素区域换算为参考分辨率下的区域(供校准脚本写入配置)"""
+    if not config.get("reference_resolution"):
+        config["reference_resolution"] = list(screen_size)
+        config["config_version"] = CONFIG_VERSION
+    geometry = Geometry(config, screen_size)
+    x, y, w, h = region
+    return [
+        round((x - geometry.offset_x) / geometry.scale_x),
+        round(y / geometry.scale_y),
+        round(w / geometry.scale_x),
+        round(h / geometry.scale_y),
+    ]
+
+
+def to_reference_fraction(config: Dict[str, Any], point: Sequence[int], screen_size: Tuple[int, int]) -> list:
+    """将当前屏幕上选取的像素位置换算为参考分辨率下的屏幕比例(供校准脚本写入配置)"""
+    if not config.get("reference_resolution"):
+        config["reference_resolution"] = list(screen_size)
+        config["config_version"] = CONFIG_VERSION
+    geometry = Geometry(config, screen_size)
+    ref_width, ref_height = geometry.reference_size
+    return [
+        round((point[0] - geometry.offset_x) / geometry.scale_x / ref_width, 4),
+        round(point[1] / geometry.scale_y / ref_height, 4),
+    ]
+
+
+def migrate_config(config: Dict[str, Any], screen_size: Tuple[int, int]) -> bool:
+    """
+    旧版配置迁移: 旧配置的像素区域是在当前屏幕上直接选取的, 以当前屏幕尺寸作为参考分辨率。
+    返回配置是否被修改
+    """
+    if config.get("config_version", 1) >= CONFIG_VERSION and config.get("reference_resolution"):
+        return False
+    config.setdefault("reference_resolution", list(screen_size))
+    config.setdefault("scale_mode", "stretch")
+    config["config_version"] = CONFIG_VERSION
+    print(f"配置已迁移到版本 {CONFIG_VERSION}, 参考分辨率: {config['reference_resolution']}")
+    return True
@@ -0,0 +1,41 @@
+"""图像预处理工具(主程序与校准脚本共用)"""
+from functools import lru_cache
+from typing import Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# 二值化阈值
+PRICE_THRESHOLD = 55  # 价格区域
+NAME_THRESHOLD = 100  # 名称区域
+
+
+@lru_cache(maxsize=None)
+def build_binarize_lut(threshold: int) -> np.ndarray:
+    """生成256项查找表: 灰度大于阈值的像素映射为0(黑), 其余为255(白), 即二值化与反色一步完成"""
+    lut = np.full(256, 255, dtype=np.uint8)
+    lut[threshold + 1:] = 0
+    lut.flags.writeable = False
+    return lut
+
+
+def to_gray(image: Union[Image.Image, np.ndarray]) -> np.ndarray:
+    """
+    转为uint8灰度数组, 输入为RGB/RGBA数组或PIL图像
+
+    与PIL的 convert("L") 逐像素一致: (R*19595 + G*38470 + B*7471 + 0x8000) >> 16,
+    保证阈值与原实现校准的结果相同(cv2.cvtColor 的舍入方式不同, 约0.1%的像素差1)
+    """
+    if isinstance(image, np.ndarray):
+        if image.ndim == 2:
+            return image
+        image = Image.fromarray(image)
+    if image.mode == "L":
+        return np.asarray(image)
+    return np.asarray(image.convert("L"))
+
+
+def binarize(image: Union[Image.Image, np.ndarray], threshold: int) -> np.ndarray:
+    """灰度化 + 阈值二值化 + 反色, 返回uint8数组(白底黑字)"""
+    return cv2.LUT(to_gray(image), build_binarize_lut(threshold))
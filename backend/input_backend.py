@@ -0,0 +1,84 @@
+"""
+鼠标键盘输入后端
+
+- pyautogui: 实际操作鼠标键盘
+- recording: 只记录操作不执行, 可注册回调在点击/按键时切换回放画面, 用于无桌面环境下回放整个流程
+"""
+import time
+from typing import Callable, List, Optional, Tuple
+
+Position = Tuple[int, int]
+
+
+class InputBackend:
+    """输入后端基类"""
+
+    name = "base"
+
+    def move_to(self, x: int, y: int) -> None:
+        raise NotImplementedError
+
+    def click(self) -> None:
+        """在当前位置单击左键"""
+        raise NotImplementedError
+
+    def press(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class PyAutoGuiInput(InputBackend):
+    """pyautogui输入(原有实现)"""
+
+    name = "pyautogui"
+
+    def __init__(self, pause: Optional[float] = None):
+        import pyautogui
+        self._pyautogui = pyautogui
+        self._default_pause = pyautogui.PAUSE
+        self.set_pause(pause)
+
+    def set_pause(self, pause: Optional[float]) -> None:
+        """
+        设置每次输入操作后的暂停时间, None 表示使用pyautogui默认值(0.1秒)。
+        pyautogui的暂停是未启用就绪检测时界面切换的等待时间, 只有启用就绪检测时才应缩短
+        """
+        self._pyautogui.PAUSE = self._default_pause if pause is None else pause
+
+    def move_to(self, x: int, y: int) -> None:
+        self._pyautogui.moveTo(x, y)
+
+    def click(self) -> None:
+        self._pyautogui.click()
+
+    def press(self, key: str) -> None:
+        self._pyautogui.press(key)
+
+
+class RecordingInput(InputBackend):
+    """记录所有操作的输入后端, events 中每项为 (时间, 操作, 参数)"""
+
+    name = "recording"
+
+    def __init__(self, on_click: Optional[Callable[[Position], None]] = None,
+                 on_press: Optional[Callable[[str], None]] = None):
+        self.on_click = on_click
+        self.on_press = on_press
+        self.position: Position = (0, 0)
+        self.events: List[Tuple[float, str, object]] = []
+
+    def move_to(self, x: int, y: int) -> None:
+        self.position = (x, y)
+        self.events.append((time.perf_counter(), "move", self.position))
+
+    def click(self) -> None:
+        self.events.append((time.perf_counter(), "click", self.position))
+        if self.on_click is not None:
+            self.on_click(self.position)
+
+    def press(self, key: str) -> None:
+        self.events.append((time.perf_counter(), "press", key))
+        if self.on_press is not None:
+            self.on_press(key)
+
+    def clicks(self) -> List[Position]:
+        return [args for _, action, args in self.events if action == "click"]
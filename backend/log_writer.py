@@ -0,0 +1,119 @@
+"""
+后台日志写入器
+
+调用方只将记录放入队列, 由写入线程累积一段时间(flush_interval)或累积到 max_batch 条后一次写入,
+购买流程中不再发生文件读写。退出时调用 close() 写完队列中剩余的记录。
+BatchWriter 为通用的 队列 + 批量写入线程, 价格记录库(price_store)也使用它。
+"""
+import datetime
+import json
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_STOP = object()
+
+
+class _FlushRequest:
+    __slots__ = ("done",)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class BatchWriter:
+    """
+    队列 + 写入线程的批量写入基类, 子类实现 _write_batch
+
+    收到一批中的第一条记录后开始计时, 到达 flush_interval 或累积到 max_batch 条时写入
+    """
+
+    thread_name = "batch-writer"
+
+    def __init__(self, flush_interval: float = 1.0, max_batch: int = 1000):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def _put(self, item: Any) -> None:
+        self._queue.put(item)
+
+    def _write_batch(self, batch: List[Any]) -> None:
+        raise NotImplementedError
+
+    def _flush(self, batch: List[Any]) -> None:
+        if not batch:
+            return
+        try:
+            self._write_batch(batch)
+        except Exception as e:
+            logging.error(f"{self.thread_name} 写入失败: {e}")
+
+    def _run(self) -> None:
+        batch: List[Any] = []
+        deadline: Optional[float] = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # 到达写入时间
+            if item is _STOP:
+                self._flush(batch)
+                return
+            if isinstance(item, _FlushRequest):
+                self._flush(batch)
+                batch, deadline = [], None
+                item.done.set()
+                continue
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.max_batch and time.monotonic() < deadline:
+                    continue
+            self._flush(batch)
+            batch, deadline = [], None
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """立即写入已排队的记录, 写入完成后返回"""
+        request = _FlushRequest()
+        self._queue.put(request)
+        request.done.wait(timeout)
+
+    def close(self) -> None:
+        """写完剩余记录并停止写入线程"""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+
+class AsyncLogWriter(BatchWriter):
+    """批量追加文本/JSON Lines日志"""
+
+    thread_name = "log-writer"
+
+    def write(self, path: Path, line: str) -> None:
+        """追加一行文本(不含换行符)"""
+        self._put((path, line))
+
+    def write_json(self, path: Path, record: Dict[str, Any]) -> None:
+        """追加一条JSON Lines记录, 自动添加时间戳"""
+        record.setdefault("time", datetime.datetime.now().isoformat(timespec="milliseconds"))
+        self._put((path, json.dumps(record, ensure_ascii=False)))
+
+    def _write_batch(self, batch: List[Tuple[Path, str]]) -> None:
+        lines_by_path: Dict[Path, List[str]] = defaultdict(list)
+        for path, line in batch:
+            lines_by_path[path].append(line)
+        for path, lines in lines_by_path.items():
+            try:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+            except OSError as e:
+                logging.error(f"写入日志 {path} 失败: {e}")
@@ -1,14 +1,35 @@
-import json
-import pyautogui
 import time
+STARTUP_TIME = time.perf_counter()  # 用于统计启动耗时
+
+import json
+import argparse
+import socket
+import numpy as np
 from PIL import Image
 import os
-import keyboard
 import datetime
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import AuthenticationError
 from pathlib import Path
-from typing import Optional, Tuple, List, Dict, Any
-from paddleocr import PaddleOCR
+from typing import Optional, Tuple, List, Dict, Any, Union
+from image_utils import binarize, PRICE_THRESHOLD, NAME_THRESHOLD
+from digit_ocr import DigitRecognizer
+from ocr_utils import OcrEngines
+from ocr_service import OcrClient
+from name_cache import NameCache
+from capture import CaptureBackend, MultiRegionGrabber, create_capture_backend
+from input_backend import InputBackend, PyAutoGuiInput
+from metrics import StageMetrics
+from screen_wait import ScreenWaiter
+from card_locator import CardLocator, DEFAULT_TEMPLATES_DIR
+from geometry import Geometry, migrate_config
+from cards import CardIndex, CardRecord, compile_cards
+from log_writer import AsyncLogWriter
+from config_io import ConfigWatcher, save_json_atomic
+from price_store import PriceStore, DEFAULT_DB_FILE
+from scheduler import PollScheduler
+from coordination import SharedStore, shard_cards, new_session_id, DEFAULT_STORE_FILE
 
 # 禁用PaddleOCR调试日志
 os.environ["PPOCR_LOG_LEVEL"] = "ERROR"
@@ -19,7 +40,11 @@ try:
     SCRIPT_DIR = Path(__file__).parent.resolve()
     CONFIG_PATH = (SCRIPT_DIR / "../config/config.json").resolve()  # 向上一级到assets目录
     IMAGES_DIR = SCRIPT_DIR / "images"
+    PRICE_SAMPLES_DIR = SCRIPT_DIR / "price_samples"  # 数字识别器的标注样本目录
+    NAME_CACHE_FILE = SCRIPT_DIR / "name_cache.json"  # 名称识别缓存
     LOGS_FILE = SCRIPT_DIR / "logs.txt"
+    AUDIT_FILE = SCRIPT_DIR / "audit.jsonl"  # 结构化记录: 每次价格观测与购买
+    METRICS_FILE = SCRIPT_DIR / "metrics.json"  # 退出时写入的各阶段耗时统计
     
     # 打印路径用于调试
     print(f"脚本目录: {SCRIPT_DIR}")
@@ -33,11 +58,15 @@ except Exception as e:
 is_loop: bool = False  # 是否循环执行
 is_debug: bool = True  # 调试模式
 is_running: bool = False  # 是否正在运行
-screen_width, screen_height = pyautogui.size()  # 屏幕尺寸
+save_ocr_images: bool = False  # 是否将OCR输入图像保存到images目录(仅用于排查问题)
+screen_width: int = 0  # 屏幕尺寸, 在main()中由截图后端获取
+screen_height: int = 0
+capture_backend: Optional[CaptureBackend] = None  # 截图后端, 在main()中按配置创建
+input_backend: Optional[InputBackend] = None  # 鼠标键盘输入后端, 在main()中创建
 
-# 初始化OCR模型
-ocr_chinese = PaddleOCR(use_angle_cls=True, lang='ch')  # 中文OCR模型
-ocr_english = PaddleOCR(use_angle_cls=True, lang='en')  # 英文OCR模型(用于数字识别)
+# OCR模型按需加载: 'ch'为中文模型(门卡名称), 'en'为英文模型(价格数字)
+# 启用 ocr_service 时替换为常驻OCR服务的客户端
+ocr_engines: Union[OcrEngines, OcrClient] = OcrEngines()
 
 
 class ConfigManager:
@@ -60,13 +89,10 @@ class ConfigManager:
             return {}
 
     @staticmethod
-    def get_region(config: Dict[str, Any], key: str) -> Optional[Tuple[int, int, int, int]]:
-        """从配置中获取区域坐标"""
-        region = config.get(key)
-        if not region or len(region) != 4:
-            logging.error(f"配置中缺少有效的 {key} 字段")
-            return None
-        return tuple(region)
+    def save_config(config: Dict[str, Any]) -> None:
+        """保存配置文件(先写临时文件再替换, 不会留下写了一半的配置)"""
+        save_json_atomic(CONFIG_PATH, config, indent=2)
+
 
 
 class ScreenshotHelper:
@@ -78,52 +104,319 @@ class ScreenshotHelper:
         directory.mkdir(parents=True, exist_ok=True)
     
     @staticmethod
-    def take_screenshot(region: Tuple[int, int, int, int], threshold: int) -> Optional[Image.Image]:
-        """截取指定区域的截图并二值化"""
+    def create_backend(config: Dict[str, Any]) -> CaptureBackend:
+        """根据配置创建截图后端"""
+        capture_config = config.get("capture", {})
+        backend = create_capture_backend(
+            capture_config.get("backend", "mss"),
+            replay_dir=capture_config.get("replay_dir"),
+            auto_advance=capture_config.get("auto_advance", False),
+        )
+        print(f"截图后端: {backend.name}")
+        return backend
+
+    @staticmethod
+    def take_screenshot(region: Tuple[int, int, int, int], threshold: int) -> Optional[np.ndarray]:
+        """截取指定区域的截图并二值化(查找表一次完成阈值与反色)"""
         try:
-            screenshot = pyautogui.screenshot(region=region)
-            gray_image = screenshot.convert('L')  # 转为灰度图
-            # 二值化处理
-            binary_image = gray_image.point(lambda p: 255 if p > threshold else 0)
-            binary_image = Image.eval(binary_image, lambda x: 255 - x)  # 反色
-            return binary_image
+            screenshot = capture_backend.grab(region)
+            return binarize(screenshot, threshold)
         except Exception as e:
             logging.error(f"截图失败: {str(e)}")
             return None
 
+    @staticmethod
+    def dump_debug_image(image: np.ndarray, filename: str) -> None:
+        """按需将OCR输入图像保存到IMAGES_DIR, 默认关闭以避免每次检查的磁盘读写"""
+        if not save_ocr_images:
+            return
+        try:
+            ScreenshotHelper.ensure_dir_exists(IMAGES_DIR)
+            Image.fromarray(image).save(IMAGES_DIR / filename)
+        except Exception as e:
+            logging.warning(f"保存调试截图失败: {str(e)}")
+
 
 class CardProcessor:
     """门卡处理器"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], cards: Optional[CardIndex] = None):
         self.config = config
-        # 购买按钮位置(默认值: 屏幕宽度82.5%, 高度86%)
-        self.purchase_btn_location = config.get("purchase_btn_location", [0.825, 0.86])
+        # 启动时一次性换算所有区域、门卡位置与购买按钮的像素坐标
+        self.geometry = Geometry(config, (screen_width, screen_height))
+        # 配置中的门卡位置, 门卡定位器未找到门卡时恢复为该位置
+        self.configured_positions = dict(self.geometry.positions)
+        # 编译门卡列表: 预先计算购买阈值并建立名称索引
+        self.cards: CardIndex = cards or compile_cards(config)
+        # 各区域是否使用仅识别模式(跳过文本检测与方向分类)
+        rec_only = config.get("ocr_rec_only", {})
+        self.name_rec_only = rec_only.get("card_name_range", False)
+        self.price_rec_only = rec_only.get("card_price_range", False)
+        # 仅识别模式不使用方向分类器, 无需加载该模型; 价格识别从不使用方向分类
+        ocr_engines.configure('ch', use_angle_cls=not self.name_rec_only)
+        ocr_engines.configure('en', use_angle_cls=False)
+        # 价格快速识别器配置
+        self.digit_ocr_config = config.get("digit_ocr", {})
+        self.digit_recognizer = self._load_digit_recognizer(self.digit_ocr_config)
+        # 名称识别缓存
+        self.name_cache = self._load_name_cache()
+        # 价格变化检测: 记录每张门卡上次的价格截图与识别结果, 截图未变化时跳过OCR
+        gate_config = config.get("price_change_gate", {})
+        self.price_gate_enabled = gate_config.get("enabled", True)
+        self.price_gate_tolerance = gate_config.get("tolerance", 0)  # 允许不同的像素数
+        self.last_price_frames: Dict[str, Tuple[np.ndarray, int, float]] = {}
+        self.price_confidence = 0.0  # 最近一次价格识别的置信度
+        self.price_ocr_calls = 0
+        self.price_ocr_skipped = 0
+        # 多区域截图器, 首次截图时创建
+        self.grabber: Optional[MultiRegionGrabber] = None
+        # 界面就绪检测, 首次使用时创建; 未启用时使用固定等待
+        self.ready_wait_config = config.get("ready_wait", {})
+        self.waiter: Optional[ScreenWaiter] = None
+        self.panel_signature: Optional[np.ndarray] = None
+        # 门卡定位器: 启用时每轮检查前通过模板匹配更新门卡位置
+        self.locator = self._load_locator(config, self.geometry)
+        # 后台日志写入
+        self.log_writer = AsyncLogWriter(flush_interval=config.get("log_flush_interval", 1.0))
+        # 价格观测记录库
+        self.price_store = self._load_price_store()
+        # 自适应轮询调度器, 启用时由main()创建, 每次价格观测都会通知调度器
+        self.scheduler: Optional[PollScheduler] = None
+        # 多实例协同: 共享购买记录, 由main()在协调模式下设置
+        self.shared_store: Optional[SharedStore] = None
+        self.worker_id = socket.gethostname()
+        # 流水线模式: 名称与价格识别各自使用一个工作线程并行执行
+        metrics_config = config.get("metrics", {})
+        self.metrics = StageMetrics(enabled=metrics_config.get("enabled", True))
+        self.metrics_file = Path(metrics_config.get("file") or METRICS_FILE)
+        self.name_executor: Optional[ThreadPoolExecutor] = None
+        self.price_executor: Optional[ThreadPoolExecutor] = None
+        if config.get("pipeline", {}).get("enabled", True):
+            self.name_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-name")
+            self.price_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-price")
+
+    def prepare_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        热加载第一步: 根据新配置构建门卡列表, 区域坐标与各项阈值, 不修改处理器。
+        配置格式有误时抛出异常(ValueError/TypeError/KeyError等), 处理器仍使用原配置
+        """
+        geometry = Geometry(config, (screen_width, screen_height))
+        gate_config = config.get("price_change_gate", {})
+        digit_ocr_config = config.get("digit_ocr", {})
+        digit_recognizer = self.digit_recognizer
+        if digit_ocr_config.get("enabled", True) != self.digit_ocr_config.get("enabled", True):
+            digit_recognizer = self._load_digit_recognizer(digit_ocr_config)
+        return {
+            "config": config,
+            "geometry": geometry,
+            "configured_positions": dict(geometry.positions),
+            "cards": compile_cards(config),
+            "ready_wait_config": dict(config.get("ready_wait", {})),
+            "price_gate_enabled": bool(gate_config.get("enabled", True)),
+            "price_gate_tolerance": int(gate_config.get("tolerance", 0)),
+            "digit_ocr_config": digit_ocr_config,
+            "digit_recognizer": digit_recognizer,
+            "digit_min_confidence": float(digit_ocr_config.get("min_confidence", 0.8)),
+            "locator": self._load_locator(config, geometry),
+        }
+
+    def commit_config(self, state: Dict[str, Any]) -> None:
+        """
+        热加载第二步: 替换为 prepare_config 构建的状态(不会失败)。
+        已加载的OCR模型, 名称缓存与执行器保持不变(仅识别模式等模型相关配置需重启生效)
+        """
+        if state["geometry"].regions != self.geometry.regions:
+            # 区域变化后, 截图器需重建, 旧的价格截图也不再可比
+            self.grabber = None
+            self.last_price_frames.clear()
+        # 就绪检测参数可能变化, 下次使用时重建
+        self.waiter = None
+        self.panel_signature = None
+        for name, value in state.items():
+            if name != "digit_min_confidence":
+                setattr(self, name, value)
+        if self.digit_recognizer is not None:
+            self.digit_recognizer.min_confidence = state["digit_min_confidence"]
+
+    def apply_config(self, config: Dict[str, Any]) -> None:
+        """热加载配置, 新配置无效时抛出异常且保持原配置"""
+        self.commit_config(self.prepare_config(config))
+
+    def _load_price_store(self) -> Optional[PriceStore]:
+        """根据配置打开价格观测记录库"""
+        store_config = self.config.get("price_store", {})
+        if not store_config.get("enabled", True):
+            return None
+        # 协调模式下各实例的价格记录默认写入共享数据库
+        default_path = coordination_store_path(self.config) or DEFAULT_DB_FILE
+        return PriceStore(
+            Path(store_config.get("path") or default_path),
+            flush_interval=self.config.get("log_flush_interval", 1.0),
+        )
+
+    @staticmethod
+    def _load_locator(config: Dict[str, Any], geometry: Geometry) -> Optional[CardLocator]:
+        """根据配置创建门卡定位器"""
+        locator_config = config.get("card_locator", {})
+        if not locator_config.get("enabled", False):
+            return None
+        # grid_region 与其他区域一样以参考分辨率记录, 换算为当前屏幕像素
+        grid_region = locator_config.get("grid_region")
+        locator = CardLocator(
+            Path(locator_config.get("templates_dir") or DEFAULT_TEMPLATES_DIR),
+            grid_region=geometry.scale_region(grid_region) if grid_region else None,
+            scales=locator_config.get("scales", [0.9, 1.0, 1.1]),
+            threshold=locator_config.get("threshold", 0.8),
+        )
+        if not locator.templates:
+            logging.warning("门卡模板目录为空, 将使用配置中的固定位置")
+            return None
+        return locator
+
+    def locate_cards(self, cards: List[CardRecord]) -> None:
+        """截取一次整屏画面, 用模板匹配更新各门卡的点击位置(未找到时恢复为配置中的位置)"""
+        if self.locator is None:
+            return
+        with self.metrics.time("locate"):
+            try:
+                screen = capture_backend.grab_screen()
+            except Exception as e:
+                logging.error(f"截图失败: {str(e)}")
+                return
+            positions = self.locator.locate(screen, [card.name for card in cards])
+        for card in cards:
+            position = positions.get(card.name) or self.configured_positions.get(card.name)
+            if position is not None:
+                self.geometry.positions[card.name] = position
+
+    def _load_name_cache(self) -> Optional[NameCache]:
+        """根据配置创建名称缓存并加载上次运行保存的条目"""
+        cache_config = self.config.get("name_cache", {})
+        if not cache_config.get("enabled", True):
+            return None
+        cache = NameCache(NAME_CACHE_FILE, capacity=cache_config.get("capacity", 256))
+        cache.load()
+        return cache
+
+    @staticmethod
+    def _load_digit_recognizer(digit_ocr_config: Dict[str, Any]) -> Optional[DigitRecognizer]:
+        """加载数字模板, 模板不存在时尝试从标注样本目录学习"""
+        if not digit_ocr_config.get("enabled", True):
+            return None
+        min_confidence = digit_ocr_config.get("min_confidence", 0.8)
+        recognizer = DigitRecognizer.load(min_confidence=min_confidence)
+        if recognizer is None and PRICE_SAMPLES_DIR.exists():
+            recognizer = DigitRecognizer.train(PRICE_SAMPLES_DIR, min_confidence=min_confidence)
+            if recognizer is not None:
+                recognizer.save()
+        if recognizer is None:
+            print("未找到数字模板, 价格识别将使用PaddleOCR")
+        return recognizer
+
+    def save_price_sample(self, image: np.ndarray, price: int) -> None:
+        """将PaddleOCR识别成功的价格截图保存为标注样本, 供数字识别器学习"""
+        if not self.digit_ocr_config.get("collect_samples", False):
+            return
+        try:
+            ScreenshotHelper.ensure_dir_exists(PRICE_SAMPLES_DIR)
+            filename = f"{price}_{datetime.datetime.now():%Y%m%d-%H%M%S-%f}.png"
+            Image.fromarray(image).save(PRICE_SAMPLES_DIR / filename)
+        except Exception as e:
+            logging.warning(f"保存价格样本失败: {str(e)}")
     
-    def get_card_price(self) -> Optional[int]:
-        """获取当前门卡价格(仅识别数字)"""
-        region = ConfigManager.get_region(self.config, "card_price_range")
+    def _reuse_last_price(self, card_key: Optional[str], image: np.ndarray) -> Optional[int]:
+        """价格截图与该门卡上次截图一致(或差异在容差内)时返回上次的价格"""
+        if not self.price_gate_enabled or card_key not in self.last_price_frames:
+            return None
+        last_image, last_price, last_confidence = self.last_price_frames[card_key]
+        if last_image.shape != image.shape:
+            return None
+        if self.price_gate_tolerance <= 0:
+            unchanged = np.array_equal(last_image, image)
+        else:
+            unchanged = np.count_nonzero(last_image != image) <= self.price_gate_tolerance
+        if not unchanged:
+            return None
+        self.price_confidence = last_confidence
+        return last_price
+
+    def capture_regions(self) -> Optional[Dict[str, np.ndarray]]:
+        """一次截图获取所有区域的原始图像(同一帧画面)"""
+        if self.grabber is None:
+            regions = self.geometry.regions
+            if not regions:
+                logging.error("配置中没有有效的区域")
+                return None
+            self.grabber = MultiRegionGrabber(capture_backend, regions)
+        try:
+            return self.grabber.grab()
+        except Exception as e:
+            logging.error(f"截图失败: {str(e)}")
+            return None
+
+    def _region_image(self, key: str, threshold: int, raw: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """获取区域的二值化图像, 未提供原始图像时单独截图"""
+        if raw is not None:
+            with self.metrics.time("binarize"):
+                return binarize(raw, threshold)
+        region = self.geometry.regions.get(key)
         if not region:
+            logging.error(f"配置中缺少有效的 {key} 字段")
             return None
+        return ScreenshotHelper.take_screenshot(region=region, threshold=threshold)
 
+    def get_card_price(self, card_key: Optional[str] = None, raw: Optional[np.ndarray] = None) -> Optional[int]:
+        """获取当前门卡价格(仅识别数字), card_key用于价格变化检测, raw为已截取的价格区域图像"""
         # 截取并处理价格区域图像
-        image = ScreenshotHelper.take_screenshot(region=region, threshold=55)
-        if not image:
+        image = self._region_image("card_price_range", PRICE_THRESHOLD, raw)
+        if image is None:
             return None
 
-        # 保存价格截图
-        ScreenshotHelper.ensure_dir_exists(IMAGES_DIR)
-        price_image_path = IMAGES_DIR / "card_price.png"
-        image.save(price_image_path)
-        
-        # 使用英文OCR识别价格
-        result = ocr_english.ocr(str(price_image_path), cls=False)
-        if not result or not result[0]:
+        # 可选: 保存价格截图
+        ScreenshotHelper.dump_debug_image(image, "card_price.png")
+
+        # 价格区域未变化时直接复用上次结果
+        price = self._reuse_last_price(card_key, image)
+        if price is not None:
+            self.price_ocr_skipped += 1
+            return price
+
+        self.price_ocr_calls += 1
+        price = self._fast_price(image)
+        if price is None:
+            # 直接将内存中的图像数组交给英文OCR识别价格, 不经过PNG文件
+            result = ocr_engines.recognize('en', image, rec_only=self.price_rec_only)
+            price = self._parse_price_result(result)
+            if price is not None:
+                self.price_confidence = result[1]
+                self.save_price_sample(image, price)
+        if price is not None and card_key is not None:
+            self.last_price_frames[card_key] = (image, price, self.price_confidence)
+        return price
+
+    def _fast_price(self, image: np.ndarray) -> Optional[int]:
+        """使用数字识别器识别价格, 不可用或置信度不足时返回None(需回退到PaddleOCR)"""
+        if self.digit_recognizer is None:
+            return None
+        price, confidence = self.digit_recognizer.recognize(image)
+        if price is not None:
+            self.price_confidence = confidence
+        if is_debug:
+            if price is not None:
+                print(f"数字识别器识别价格: {price} (置信度: {confidence:.2f})")
+            else:
+                print(f"数字识别器置信度不足({confidence:.2f}), 回退到PaddleOCR")
+        return price
+
+    @staticmethod
+    def _parse_price_result(result: Optional[Tuple[str, float]]) -> Optional[int]:
+        """从PaddleOCR识别结果中解析价格"""
+        if not result:
             logging.warning("无法识别价格")
             return None
 
         # 提取识别文本
-        text = result[0][0][1][0]  # 获取第一个识别结果的文字部分
+        text, _ = result
         if is_debug:
             print(f"提取的门卡原始价格文本: {text}")
 
@@ -139,115 +432,405 @@ class CardProcessor:
             logging.warning("无法解析价格")
             return None
     
-    def get_card_name(self) -> Optional[str]:
-        """获取当前门卡名称"""
-        region = ConfigManager.get_region(self.config, "card_name_range")
-        if not region:
-            return None
-
+    def get_card_name(self, raw: Optional[np.ndarray] = None) -> Optional[str]:
+        """获取当前门卡名称, raw为已截取的名称区域图像"""
         # 截取门卡名称区域
-        screenshot = ScreenshotHelper.take_screenshot(region=region, threshold=100)
-        if not screenshot:
+        screenshot = self._region_image("card_name_range", NAME_THRESHOLD, raw)
+        if screenshot is None:
             return None
 
-        # 保存名称截图
-        ScreenshotHelper.ensure_dir_exists(IMAGES_DIR)
-        name_image_path = IMAGES_DIR / "card_name.png"
-        screenshot.save(name_image_path)
-        
-        # 使用中文OCR识别门卡名称
-        result = ocr_chinese.ocr(str(name_image_path), cls=True)
-        if not result or not result[0]:
+        # 可选: 保存名称截图
+        ScreenshotHelper.dump_debug_image(screenshot, "card_name.png")
+
+        # 命中缓存时直接返回, 跳过中文OCR
+        if self.name_cache is not None:
+            cached_name = self.name_cache.get(screenshot)
+            if cached_name is not None:
+                return cached_name
+
+        # 直接将内存中的图像数组交给中文OCR识别门卡名称
+        result = ocr_engines.recognize('ch', screenshot, rec_only=self.name_rec_only, cls=True)
+        return self._store_name_result(screenshot, result)
+
+    def _store_name_result(self, screenshot: np.ndarray, result: Optional[Tuple[str, float]]) -> Optional[str]:
+        """从OCR识别结果中提取门卡名称并写入缓存"""
+        if not result:
             logging.warning("无法识别门卡名称")
             return None
 
         # 提取并处理识别文本
-        text = result[0][0][1][0]  # 获取第一个识别结果的文字部分
-        return text.replace(" ", "").strip()  # 去除空格和空白字符
+        text, _ = result
+        name = text.replace(" ", "").strip()  # 去除空格和空白字符
+        if name and self.name_cache is not None:
+            self.name_cache.put(screenshot, name)
+        return name
+
+    def read_cards_batch(self, captures: List[Tuple[Optional[str], Dict[str, np.ndarray]]]) -> List[Tuple[Optional[str], Optional[int]]]:
+        """
+        批量识别多张门卡的名称与价格
+
+        captures为[(门卡标识, 区域图像)], 名称缓存、价格变化检测与数字识别器未能解决的裁剪图
+        分别合并为一次中文与一次英文批量推理, 返回与输入顺序一致的[(名称, 价格)]。
+        批量推理只做文本识别, 区域未配置为仅识别模式(ocr_rec_only)时改为逐张完整识别
+        """
+        names: List[Optional[str]] = [None] * len(captures)
+        prices: List[Optional[int]] = [None] * len(captures)
+        name_images: Dict[int, np.ndarray] = {}
+        price_images: Dict[int, np.ndarray] = {}
+
+        for i, (card_key, frames) in enumerate(captures):
+            if frames.get("card_name_range") is not None:
+                image = binarize(frames["card_name_range"], NAME_THRESHOLD)
+                names[i] = self.name_cache.get(image) if self.name_cache is not None else None
+                if names[i] is None:
+                    name_images[i] = image
+            if frames.get("card_price_range") is not None:
+                image = binarize(frames["card_price_range"], PRICE_THRESHOLD)
+                prices[i] = self._reuse_last_price(card_key, image)
+                if prices[i] is not None:
+                    self.price_ocr_skipped += 1
+                    continue
+                self.price_ocr_calls += 1
+                prices[i] = self._fast_price(image)
+                if prices[i] is None:
+                    price_images[i] = image
+                elif card_key is not None:
+                    self.last_price_frames[card_key] = (image, prices[i], self.price_confidence)
+
+        if name_images:
+            results = self._recognize_many('ch', list(name_images.values()), self.name_rec_only, cls=True)
+            for (i, image), result in zip(name_images.items(), results):
+                names[i] = self._store_name_result(image, result)
+        if price_images:
+            results = self._recognize_many('en', list(price_images.values()), self.price_rec_only)
+            for (i, image), result in zip(price_images.items(), results):
+                prices[i] = self._parse_price_result(result)
+                if prices[i] is not None:
+                    self.save_price_sample(image, prices[i])
+                    if captures[i][0] is not None:
+                        self.last_price_frames[captures[i][0]] = (image, prices[i], result[1])
+        return list(zip(names, prices))
     
     @staticmethod
-    def log_purchase(card_name: str, ideal_price: int, price: int, premium: float) -> None:
-        """记录购买信息到日志文件"""
+    def _recognize_many(lang: str, images: List[np.ndarray], rec_only: bool,
+                        cls: bool = False) -> List[Optional[Tuple[str, float]]]:
+        """仅识别模式下合并为一次批量推理, 否则逐张检测+识别(与单张识别的结果一致)"""
+        if rec_only:
+            return ocr_engines.recognize_batch(lang, images)
+        return [ocr_engines.recognize(lang, image, rec_only=False, cls=cls) for image in images]
+
+    def warm_up(self) -> None:
+        """后台预热本次运行会用到的OCR模型(有数字模板时英文模型仅作回退, 不预热)"""
+        langs = {'ch': self.name_rec_only}
+        if self.digit_recognizer is None:
+            langs['en'] = self.price_rec_only
+        ocr_engines.warm_up(langs)
+
+    def close(self) -> None:
+        """退出前停止工作线程, 保存缓存并输出统计"""
+        for executor in (self.name_executor, self.price_executor):
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self.log_writer.close()
+        if self.price_store is not None:
+            self.price_store.close()
+        if self.name_cache is not None:
+            self.name_cache.save()
+            print(self.name_cache.stats())
+        print(self.price_gate_stats())
+        print(self.metrics.summary())
+        try:
+            self.metrics.dump(self.metrics_file)
+        except OSError as e:
+            logging.error(f"写入耗时统计失败: {str(e)}")
+
+    def toggle_metrics(self) -> None:
+        """开启或关闭耗时统计(热键F10)"""
+        self.metrics.enabled = not self.metrics.enabled
+        print(f"耗时统计已{'开启' if self.metrics.enabled else '关闭'}")
+
+    def price_gate_stats(self) -> str:
+        total = self.price_ocr_calls + self.price_ocr_skipped
+        rate = self.price_ocr_skipped / total if total else 0.0
+        return f"价格识别 调用: {self.price_ocr_calls} | 跳过: {self.price_ocr_skipped} | 跳过率: {rate:.2%}"
+
+    def log_purchase(self, card_name: str, ideal_price: int, price: int, premium: float) -> None:
+        """记录购买信息(由后台线程写入日志文件)"""
         log_entry = (
             f"购买时间: {datetime.datetime.now():%Y-%m-%d %H:%M:%S} | "
             f"门卡名称: {card_name} | "
             f"理想价格: {ideal_price} | "
             f"购买价格: {price} | "
-            f"溢价: {premium:.2f}%\n"
+            f"溢价: {premium:.2f}%"
         )
-        with open(LOGS_FILE, "a", encoding="utf-8") as log_file:
-            log_file.write(log_entry)
+        self.log_writer.write(LOGS_FILE, log_entry)
+        self.log_writer.write_json(AUDIT_FILE, {
+            "type": "purchase",
+            "card": card_name,
+            "ideal_price": ideal_price,
+            "price": price,
+            "premium": round(premium, 2),
+            "debug": is_debug,
+        })
+
+    def log_observation(self, card: CardRecord, price: int, recognized_name: Optional[str] = None,
+                        confidence: Optional[float] = None) -> None:
+        """记录一次价格观测"""
+        premium = round(card.premium(price), 2) if card.ideal_price else None
+        self.log_writer.write_json(AUDIT_FILE, {
+            "type": "observation",
+            "card": card.name,
+            "recognized_name": recognized_name,
+            "price": price,
+            "premium": premium,
+            "confidence": None if confidence is None else round(float(confidence), 3),
+        })
+        if self.price_store is not None:
+            self.price_store.add(card.name, price, premium, None if confidence is None else float(confidence))
+        if self.scheduler is not None:
+            self.scheduler.observe(card, price)
+
+    def _observe_verified(self, card: CardRecord, price: int, card_name: Optional[str],
+                          confidence: Optional[float] = None) -> None:
+        """识别到的名称确认为该门卡时才记录价格观测, 避免把其他门卡的价格记到该门卡名下"""
+        if card_name and self.cards.resolve(card_name) is card:
+            self.log_observation(card, price, card_name, confidence)
+
+    def _observe_after_name(self, card: CardRecord, price: int, confidence: Optional[float], get_name) -> None:
+        """
+        价格过高时决策不等待名称识别, 名称识别完成后再确认并记录观测。
+        流水线模式下提交到名称识别线程(排在本次名称识别之后, 不阻塞主流程), 否则直接识别
+        """
+        if self.name_executor is None:
+            self._observe_verified(card, price, get_name(), confidence)
+        else:
+            self.name_executor.submit(lambda: self._observe_verified(card, price, get_name(), confidence))
     
-    def price_check_flow(self, card_info: Dict[str, Any]) -> bool:
-        """价格检查主流程"""
-        position = card_info.get('position')
-        if not position or len(position) != 2:
-            logging.error(f"门卡 {card_info.get('name')} 的position配置无效")
-            return False
+    def _read_name(self, raw: Optional[np.ndarray]) -> Optional[str]:
+        with self.metrics.time("ocr_name"):
+            return self.get_card_name(raw)
+
+    def _read_price(self, card_key: Optional[str], raw: Optional[np.ndarray]) -> Optional[int]:
+        with self.metrics.time("ocr_price"):
+            return self.get_card_price(card_key, raw)
+
+    def _start_recognition(self, card: CardRecord, frames: Dict[str, np.ndarray]):
+        """
+        启动名称与价格识别, 返回两个按需取结果的函数
+
+        流水线模式下两者分别在各自的单线程执行器中并行运行(同一OCR模型不会被并发调用),
+        否则在取结果时才串行识别
+        """
+        name_raw = frames.get("card_name_range")
+        price_raw = frames.get("card_price_range")
+        if self.name_executor is None:
+            return (lambda: self._read_name(name_raw)), (lambda: self._read_price(card.name, price_raw))
+        name_future = self.name_executor.submit(self._read_name, name_raw)
+        price_future = self.price_executor.submit(self._read_price, card.name, price_raw)
+        return name_future.result, price_future.result
+
+    @property
+    def waits_for_screen(self) -> bool:
+        """是否启用界面就绪检测"""
+        return self.ready_wait_config.get("enabled", True)
+
+    def _screen_waiter(self) -> Optional[ScreenWaiter]:
+        """创建界面就绪检测器, 默认以名称区域作为详情面板的像素签名"""
+        if self.waiter is None and self.waits_for_screen:
+            region = self.ready_wait_config.get("region")
+            region = self.geometry.scale_region(region) if region else self.geometry.regions.get("card_name_range")
+            if not region:
+                return None
+            self.waiter = ScreenWaiter(
+                capture_backend,
+                region,
+                timeout=self.ready_wait_config.get("timeout", 0.5),
+                poll_interval=self.ready_wait_config.get("poll_interval", 0.005),
+                min_diff=self.ready_wait_config.get("min_diff", 8.0),
+                stable_frames=self.ready_wait_config.get("stable_frames", 2),
+            )
+        return self.waiter
+
+    def _wait_for_change(self, baseline: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """等待画面相对baseline变化并稳定, 无法检测时退回固定等待"""
+        waiter = self._screen_waiter()
+        if waiter is None or baseline is None:
+            time.sleep(0.1)
+            return None
+        try:
+            ready, signature = waiter.wait_for_change(baseline)
+        except Exception as e:
+            logging.warning(f"界面就绪检测失败: {str(e)}")
+            time.sleep(0.1)
+            return None
+        if not ready and is_debug:
+            print("等待界面变化超时")
+        return signature
+
+    def _take_signature(self) -> Optional[np.ndarray]:
+        waiter = self._screen_waiter()
+        if waiter is None:
+            return None
+        try:
+            return waiter.signature()
+        except Exception as e:
+            logging.warning(f"界面签名截图失败: {str(e)}")
+            return None
+
+    def _escape(self) -> None:
+        """退出当前界面, 启用就绪检测时等待详情面板关闭"""
+        with self.metrics.time("escape"):
+            input_backend.press('esc')
+        if self.waits_for_screen and self.panel_signature is not None:
+            with self.metrics.time("wait_close"):
+                self._wait_for_change(self.panel_signature)
+        self.panel_signature = None
+
+    def _open_card(self, card: CardRecord) -> Optional[Dict[str, np.ndarray]]:
+        """点击门卡打开详情面板并截取各区域, 失败时返回None(面板已关闭)"""
+        position = self.geometry.positions.get(card.name)
+        if position is None:
+            logging.error(f"门卡 {card.name} 的position配置无效")
+            return None
+
+        # 记录点击前的画面签名, 用于判断详情面板何时渲染完成
+        baseline = self._take_signature() if self.waits_for_screen else None
 
         # 移动到门卡位置并点击
-        x, y = position[0] * screen_width, position[1] * screen_height
-        pyautogui.moveTo(x, y)
-        pyautogui.click()
-        time.sleep(0.1)  # 短暂等待
+        with self.metrics.time("click"):
+            input_backend.move_to(*position)
+            input_backend.click()
+        with self.metrics.time("wait"):
+            if self.waits_for_screen:
+                self.panel_signature = self._wait_for_change(baseline)
+            else:
+                time.sleep(0.1)  # 短暂等待
 
-        # 获取门卡名称
-        card_name = self.get_card_name()
-        if not card_name:
-            logging.warning("无法获取门卡名称，跳过本次检查")
-            pyautogui.press('esc')  # 退出当前界面
+        # 一次截图获取名称与价格区域
+        with self.metrics.time("capture"):
+            frames = self.capture_regions()
+        if not frames:
+            self._escape()
+            return None
+        return frames
+
+    def scan_cards(self, cards: List[CardRecord]) -> List[CardRecord]:
+        """
+        扫描模式: 依次打开一批门卡只截图不识别, 之后对整批截图做批量识别,
+        返回价格满足条件且名称匹配的门卡(需再次通过 price_check_flow 确认并购买)
+        """
+        start = time.perf_counter()
+        captures = []
+        scanned = []
+        for card in cards:
+            frames = self._open_card(card)
+            if frames is None:
+                continue
+            self._escape()
+            captures.append((card.name, frames))
+            scanned.append(card)
+
+        with self.metrics.time("ocr_batch"):
+            results = self.read_cards_batch(captures)
+
+        candidates = []
+        for card, (card_name, price) in zip(scanned, results):
+            if price is not None:
+                self._observe_verified(card, price, card_name)
+            if card_name and price is not None and price < card.max_price and self.cards.resolve(card_name) is card:
+                candidates.append(card)
+            if is_debug:
+                print(f"扫描门卡: {card.name} | 识别名称: {card_name} | 价格: {price}")
+
+        elapsed = time.perf_counter() - start
+        self.metrics.record("scan_batch", elapsed * 1000)
+        if is_debug and scanned:
+            print(f"批量扫描 {len(scanned)} 张门卡, 耗时 {elapsed:.2f} 秒, {len(scanned) / elapsed:.1f} 张/秒")
+        return candidates
+
+    def price_check_flow(self, card: CardRecord) -> bool:
+        """价格检查主流程"""
+        cycle_start = time.perf_counter()
+        frames = self._open_card(card)
+        if frames is None:
             return False
 
+        # 名称与价格识别同时进行, 决策时只等待当前需要的结果
+        get_name, get_price = self._start_recognition(card, frames)
+
+        def decided() -> None:
+            now = time.perf_counter()
+            self.metrics.record("decide", (now - decide_start) * 1000)
+            self.metrics.record("click_to_decision", (now - cycle_start) * 1000)
+
         # 获取门卡价格
-        current_price = self.get_card_price()
+        current_price = get_price()
+        decide_start = time.perf_counter()  # 决策耗时不含等待识别结果的时间
         if current_price is None:
             logging.warning("无法获取有效价格，跳过本次检查")
-            pyautogui.press('esc')
+            decided()
+            self._escape()
             return False
 
-        # 计算价格阈值和溢价率
-        floating_percentage_range = card_info.get('floating_percentage_range', 0.1)
-        ideal_price = card_info.get('ideal_price', 0)
-        max_price = ideal_price + (ideal_price * floating_percentage_range)
-        premium = ((current_price / ideal_price) - 1) * 100
+        # 溢价率(购买阈值已在编译配置时计算)
+        premium = card.premium(current_price)
+        confidence = self.price_confidence
 
-        # 验证门卡名称是否匹配
-        if card_name not in card_info.get("name", []):
+        # 打印价格信息
+        print(
+            f"理想价格: {card.ideal_price} | "
+            f"最高可接受价格: {card.max_price} | "
+            f"当前价格: {current_price} | "
+            f"溢价率: {premium:.2f}%"
+        )
+
+        # 价格过高时无需等待名称识别结果
+        if not (premium < 0 or current_price < card.max_price):
+            decided()
+            logging.info("价格过高，取消购买")
+            self._escape()
+            self._observe_after_name(card, current_price, confidence, get_name)
+            return False
+
+        # 获取门卡名称
+        card_name = get_name()
+        decide_start = time.perf_counter()
+        if not card_name:
+            decided()
+            logging.warning("无法获取门卡名称，跳过本次检查")
+            self._escape()
+            return False
+
+        # 验证门卡名称是否匹配(精确或模糊匹配到当前门卡), 匹配时才记录价格观测
+        self._observe_verified(card, current_price, card_name, confidence)
+        if self.cards.resolve(card_name) is not card:
+            decided()
             logging.warning(
                 f"识别到的门卡名称: {card_name}, "
-                f"需要购买的门卡名称: {card_info.get('name')}, "
+                f"需要购买的门卡名称: {card.name}, "
                 "门卡不匹配"
             )
-            pyautogui.press('esc')
+            self._escape()
             return False
 
-        # 打印价格信息
-        print(
-            f"理想价格: {ideal_price} | "
-            f"最高可接受价格: {max_price} | "
-            f"当前价格: {current_price} | "
-            f"溢价率: {premium:.2f}%"
-        )
+        # 价格与名称均满足, 移动到购买按钮位置
+        decided()
+        # 多实例协同: 先在共享记录中登记, 其他实例已购买该门卡时放弃; 调试模式不点击购买, 也不登记
+        if self.shared_store is not None and not is_loop and not is_debug:
+            if not self.shared_store.claim_purchase(card.name, self.worker_id, current_price):
+                logging.info(f"门卡 {card.name} 已由其他实例购买")
+                self._escape()
+                return False
+        input_backend.move_to(*self.geometry.purchase_button)
 
-        # 价格检查逻辑
-        if premium < 0 or current_price < max_price:
-            # 移动到购买按钮位置
-            btn_x = screen_width * self.purchase_btn_location[0]
-            btn_y = screen_height * self.purchase_btn_location[1]
-            pyautogui.moveTo(btn_x, btn_y)
-            
-            # 如果不是调试模式，则实际点击购买
-            if not is_debug:
-                pyautogui.click()
-            
-            # 记录购买日志
-            self.log_purchase(card_name, ideal_price, current_price, premium)
-            pyautogui.press('esc')  # 退出当前界面
-            return True
-        
-        logging.info("价格过高，取消购买")
-        pyautogui.press('esc')
-        return False
+        # 如果不是调试模式，则实际点击购买
+        if not is_debug:
+            input_backend.click()
+
+        # 记录购买日志
+        self.log_purchase(card_name, card.ideal_price, current_price, premium)
+        self._escape()
+        return True
 
 
 def set_running_state(state: bool) -> None:
@@ -258,8 +841,46 @@ def set_running_state(state: bool) -> None:
     print(f"{status}循环执行")
 
 
+def input_pause(config: Dict[str, Any]) -> Optional[float]:
+    """启用就绪检测时使用 ready_wait.input_pause, 否则返回None(保持pyautogui默认的输入间隔)"""
+    ready_wait = config.get("ready_wait", {})
+    if not ready_wait.get("enabled", True):
+        return None
+    return float(ready_wait.get("input_pause", 0.0))
+
+
+def connect_ocr_service(service_config: Dict[str, Any]) -> Union[OcrEngines, OcrClient]:
+    """连接(必要时启动)常驻OCR服务, 无法使用时改为在本进程加载模型"""
+    try:
+        client = OcrClient(tuple(service_config.get("address", ("127.0.0.1", 47291))))
+        client.connect_or_spawn(workers=service_config.get("workers", 2))
+        return client
+    except AuthenticationError as e:
+        # 端口上是其他用户或旧版本的服务(密钥不同)
+        logging.error(f"OCR服务密钥校验失败, 改为在本进程加载模型: {str(e)}")
+    except (OSError, ValueError) as e:
+        logging.error(f"无法连接OCR服务, 改为在本进程加载模型: {str(e)}")
+    return OcrEngines()
+
+
+def coordination_store_path(config: Dict[str, Any]) -> Optional[Path]:
+    """协调模式下共享数据库的路径, 未启用时返回None"""
+    coordination = config.get("coordination", {})
+    if not coordination.get("enabled", False):
+        return None
+    return Path(coordination.get("store") or DEFAULT_STORE_FILE)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="门卡抢购")
+    parser.add_argument("--shard", type=int, default=0, help="协调模式下本实例负责的分片序号(从0开始)")
+    parser.add_argument("--shards", type=int, default=1, help="协调模式下的分片总数")
+    parser.add_argument("--session", help="协调模式下的运行批次ID, 同一批次的实例共享购买配额(默认每次启动生成新的ID)")
+    return parser.parse_known_args()[0]
+
+
 def main():
-    global is_loop, is_debug, is_running
+    global is_loop, is_debug, is_running, save_ocr_images, capture_backend, input_backend, screen_width, screen_height, ocr_engines
     
     # 加载配置文件
     config = ConfigManager.load_config()
@@ -269,39 +890,190 @@ def main():
     # 更新全局配置
     is_debug = config.get("is_debug", True)
     is_loop = config.get("is_loop", False)
+    save_ocr_images = config.get("save_ocr_images", False)
     
-    # 获取需要购买的门卡列表
-    keys_config = config.get("keys", [])
-    cards_to_buy = [card for card in keys_config if card.get('want_buy', 0) == 1]
+    # 编译门卡列表并获取需要购买的门卡; 协调模式下只负责自己的分片, 跳过已由其他实例购买的门卡
+    args = parse_args()
+    store_path = coordination_store_path(config)
+    store = None
+    if store_path is not None:
+        session = args.session or config.get("coordination", {}).get("session") or new_session_id()
+        store = SharedStore(store_path, session)
+        print(f"协调模式运行批次: {session}")
+    purchased = store.purchased_cards() if store is not None and not is_loop else set()
+    card_index = compile_cards(config)
+    cards_to_buy = [card for card in shard_cards(card_index.wanted, args.shard, args.shards) if card.name not in purchased]
     if not cards_to_buy:
         print("没有需要购买的门卡，程序退出")
+        if store is not None:
+            store.close()
         return
+    if args.shards > 1:
+        print(f"分片 {args.shard + 1}/{args.shards}, 负责门卡: {[c.name for c in cards_to_buy]}")
     
-    # 初始化门卡处理器
-    processor = CardProcessor(config)
+    input_backend = PyAutoGuiInput(pause=input_pause(config))
+
+    # 使用常驻OCR服务时, 模型由服务进程加载, 本进程不再构建模型
+    service_config = config.get("ocr_service", {})
+    if service_config.get("enabled", False):
+        ocr_engines = connect_ocr_service(service_config)
+
+    # 初始化截图后端与门卡处理器
+    capture_backend = ScreenshotHelper.create_backend(config)
+    screen_width, screen_height = capture_backend.size()
+    if migrate_config(config, (screen_width, screen_height)):
+        ConfigManager.save_config(config)
+    processor = CardProcessor(config, card_index)
+    if store is not None:
+        processor.shared_store = store
+        processor.worker_id = f"{socket.gethostname()}-{args.shard}"
+    if config.get("ocr_warm_up", True):
+        processor.warm_up()
+    print(f"启动耗时: {time.perf_counter() - STARTUP_TIME:.2f} 秒(OCR模型{'在后台加载' if config.get('ocr_warm_up', True) else '将在首次识别时加载'})")
     
     # 设置热键
+    import keyboard
     keyboard.add_hotkey('f8', lambda: set_running_state(True))
     keyboard.add_hotkey('f9', lambda: set_running_state(False))
-    print("按 F8 开始循环，按 F9 停止循环")
+    keyboard.add_hotkey('f10', processor.toggle_metrics)
+    print("按 F8 开始循环，按 F9 停止循环，按 F10 开启/关闭耗时统计")
+
+    scan_batch_size = 0
+    scheduler: Optional[PollScheduler] = None
+
+    def build_loop_config(config: Dict[str, Any], cards: List[CardRecord]) -> Tuple[int, Optional[PollScheduler]]:
+        # 扫描模式: 每批门卡先统一截图再批量识别, 仅对满足条件的门卡执行购买流程
+        scan_config = config.get("scan_mode", {})
+        batch_size = int(scan_config.get("batch_size", 4)) if scan_config.get("enabled", False) else 0
+        # 自适应轮询: 价格接近阈值的门卡更频繁地检查
+        scheduler_config = config.get("scheduler", {})
+        if not scheduler_config.get("enabled", False):
+            return batch_size, None
+        return batch_size, PollScheduler.from_config(cards, scheduler_config)
+
+    scan_batch_size, scheduler = build_loop_config(config, cards_to_buy)
+    processor.scheduler = scheduler
+
+    # 本轮已购买的门卡, 一轮结束后再从购买列表中移除; purchased 记录已购买(包括其他实例购买)的门卡名称
+    bought: List[CardRecord] = []
+    last_sync = 0.0
+
+    def remove_bought() -> None:
+        nonlocal cards_to_buy
+        purchased.update(card.name for card in bought)
+        cards_to_buy = [card for card in cards_to_buy if card not in bought]
+        bought.clear()
+
+    def sync_purchases() -> None:
+        """协调模式: 每秒最多一次从共享记录同步其他实例的购买"""
+        nonlocal cards_to_buy, last_sync
+        if store is None or is_loop or time.monotonic() - last_sync < 1.0:
+            return
+        last_sync = time.monotonic()
+        done = store.purchased_cards() - purchased
+        if done:
+            purchased.update(done)
+            cards_to_buy = [card for card in cards_to_buy if card.name not in purchased]
+            print(f"其他实例已购买: {sorted(done)}")
+
+    # 配置热加载: 校准脚本修改配置后无需重启即可生效
+    reload_config = config.get("config_reload", {})
+    watcher = None
+    if reload_config.get("enabled", True):
+        watcher = ConfigWatcher(CONFIG_PATH, interval=reload_config.get("interval", 1.0),
+                                debounce=reload_config.get("debounce", 0.3))
+
+    def reload(new_config: Dict[str, Any]) -> None:
+        global is_debug, is_loop, save_ocr_images
+        nonlocal cards_to_buy, scan_batch_size, scheduler
+        # 先完整构建新状态, 全部成功后才替换; 任何一步出错都保持原配置继续运行
+        try:
+            migrated = migrate_config(new_config, (screen_width, screen_height))
+            flags = (new_config.get("is_debug", True), new_config.get("is_loop", False),
+                     new_config.get("save_ocr_images", False))
+            state = processor.prepare_config(new_config)
+            new_cards = [card for card in shard_cards(state["cards"].wanted, args.shard, args.shards)
+                         if card.name not in purchased]
+            loop_state = build_loop_config(new_config, new_cards)
+            pause = input_pause(new_config)
+        except Exception as e:
+            logging.error(f"新配置无效, 继续使用原配置: {type(e).__name__}: {e}")
+            return
+        processor.commit_config(state)
+        is_debug, is_loop, save_ocr_images = flags
+        cards_to_buy = new_cards
+        scan_batch_size, scheduler = loop_state
+        processor.scheduler = scheduler
+        if isinstance(input_backend, PyAutoGuiInput):
+            input_backend.set_pause(pause)
+        if migrated:
+            try:
+                ConfigManager.save_config(new_config)
+                watcher.mark_current()
+            except OSError as e:
+                logging.error(f"保存迁移后的配置失败: {str(e)}")
+        print(f"配置已重新加载, 待购买门卡: {[c.name for c in cards_to_buy]}")
+
+    def check_card(card: CardRecord) -> None:
+        print(f"正在检查门卡: {card.name}")
+        if processor.price_check_flow(card):
+            # 如果不是循环模式，则从购买列表中移除
+            if not is_loop:
+                bought.append(card)
+            print(f"剩余待购买门卡: {[c.name for c in cards_to_buy if c not in bought]}")
+        if not processor.waits_for_screen:
+            time.sleep(0.1)  # 短暂间隔
+
+    def poll_scheduled() -> None:
+        """调度模式: 检查已到期的门卡, 没有到期门卡时等待"""
+        due = scheduler.pop_due(scan_batch_size or 1)
+        if not due:
+            wait = scheduler.time_until_due()
+            time.sleep(0.1 if wait is None else min(wait, 0.1))
+            return
+        processor.locate_cards(due)
+        for card in (processor.scan_cards(due) if scan_batch_size else due):
+            check_card(card)
+        for card in due:
+            if card not in bought and card.name not in purchased:
+                scheduler.reschedule(card)
 
     # 主循环
-    while True:
-        if is_running:
-            # 使用副本遍历以便安全删除元素
-            for card_info in cards_to_buy.copy():  
-                if not is_running:
-                    break
-                
-                print(f"正在检查门卡: {card_info['name']}")
-                if processor.price_check_flow(card_info):
-                    # 如果不是循环模式，则从购买列表中移除
-                    if not is_loop:
-                        cards_to_buy.remove(card_info)
-                    print(f"剩余待购买门卡: {[card['name'] for card in cards_to_buy]}")
-                time.sleep(0.1)  # 短暂间隔
-        else:
-            time.sleep(0.1)  # 非运行状态时降低CPU占用
+    try:
+        while True:
+            if watcher is not None:
+                new_config = watcher.poll()
+                if new_config is not None:
+                    reload(new_config)
+            sync_purchases()
+            if is_running and scheduler is not None:
+                poll_scheduled()
+                if bought:
+                    remove_bought()
+            elif is_running:
+                processor.locate_cards(cards_to_buy)
+                if scan_batch_size:
+                    for i in range(0, len(cards_to_buy), scan_batch_size):
+                        if not is_running:
+                            break
+                        for card in processor.scan_cards(cards_to_buy[i:i + scan_batch_size]):
+                            check_card(card)
+                else:
+                    for card in cards_to_buy:
+                        if not is_running:
+                            break
+                        check_card(card)
+                if bought:
+                    remove_bought()
+            else:
+                time.sleep(0.1)  # 非运行状态时降低CPU占用
+    finally:
+        processor.close()
+        capture_backend.close()
+        if store is not None:
+            store.close()
+        if isinstance(ocr_engines, OcrClient):
+            ocr_engines.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+"""
+各阶段耗时统计
+
+每个阶段保留最近的耗时样本, 退出时汇总 p50/p95/p99, 也可写入JSON文件便于对比不同版本。
+关闭统计时 time() 返回空的上下文管理器, record() 直接返回, 热路径上几乎没有额外开销。
+"""
+import json
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Deque, Dict
+
+import numpy as np
+
+MAX_SAMPLES = 10000  # 每个阶段保留的最近样本数
+PERCENTILES = (50, 95, 99)
+
+
+class _StageTimer:
+    """统计代码块耗时的上下文管理器"""
+
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics: "StageMetrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.metrics.record(self.stage, (time.perf_counter() - self.start) * 1000)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class StageMetrics:
+    """记录各阶段耗时(毫秒)并汇总"""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES, enabled: bool = True):
+        self.enabled = enabled
+        self.samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=max_samples))
+
+    def record(self, stage: str, elapsed_ms: float) -> None:
+        if self.enabled:
+            self.samples[stage].append(elapsed_ms)
+
+    def time(self, stage: str):
+        """统计代码块耗时"""
+        return _StageTimer(self, stage) if self.enabled else _NULL_TIMER
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """各阶段的次数, 平均值, 分位数与最大值"""
+        result = {}
+        for stage, values in list(self.samples.items()):
+            if not values:
+                continue
+            data = np.fromiter(list(values), dtype=np.float64)
+            stage_stats = {"count": int(data.size), "mean": float(data.mean())}
+            for q, value in zip(PERCENTILES, np.percentile(data, PERCENTILES)):
+                stage_stats[f"p{q}"] = float(value)
+            stage_stats["max"] = float(data.max())
+            result[stage] = stage_stats
+        return result
+
+    def summary(self) -> str:
+        lines = ["阶段耗时统计(ms):"]
+        for stage, s in self.stats().items():
+            lines.append(
+                f"  {stage:<18} 次数: {s['count']:>6} | 平均: {s['mean']:8.2f} | "
+                f"p50: {s['p50']:8.2f} | p95: {s['p95']:8.2f} | p99: {s['p99']:8.2f} | 最大: {s['max']:8.2f}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, path: Path) -> None:
+        """将汇总结果写入JSON文件"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "unit": "ms",
+                "stages": self.stats(),
+            }, f, ensure_ascii=False, indent=2)
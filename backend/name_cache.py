@@ -0,0 +1,89 @@
+"""
+门卡名称识别缓存
+
+以名称区域二值化截图的精确摘要(尺寸 + 全部像素)为键缓存OCR结果, 同一张门卡再次出现时
+直接返回已识别的名称, 无需调用中文OCR。采用LRU淘汰, 并可持久化到文件以便重启后直接命中。
+
+不使用感知哈希或相似度容差: 名称之间可能只差一个数字(如房间号), 缩小后的哈希无法区分,
+命中错误的名称会购买错误的门卡。截图有任何像素不同都视为未命中, 交给OCR识别。
+"""
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+def image_key(image: np.ndarray) -> str:
+    """二值化截图的精确摘要, 尺寸或任一像素不同时结果不同"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(image.shape).encode("ascii"))
+    digest.update(np.ascontiguousarray(image).tobytes())
+    return digest.hexdigest()
+
+
+class NameCache:
+    """以截图精确摘要为键的LRU名称缓存"""
+
+    def __init__(self, path: Optional[Path] = None, capacity: int = 256):
+        self.path = path
+        self.capacity = capacity
+        self.entries: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+    def get(self, image: np.ndarray) -> Optional[str]:
+        """查找缓存, 命中时返回名称"""
+        key = image_key(image)
+        name = self.entries.get(key)
+        if name is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return name
+
+    def put(self, image: np.ndarray, name: str) -> None:
+        """写入OCR结果, 超出容量时淘汰最久未使用的条目"""
+        key = image_key(image)
+        self.entries[key] = name
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        self.dirty = True
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"名称缓存 命中: {self.hits} | 未命中: {self.misses} | 命中率: {rate:.2%} | 条目数: {len(self.entries)}"
+
+    def load(self) -> None:
+        """从文件加载缓存, 文件不存在或格式错误时保持为空"""
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, OSError) as e:
+            logging.warning(f"名称缓存文件 {self.path} 读取失败: {e}")
+            return
+        for key, name in data.get("entries", [])[-self.capacity:]:
+            self.entries[key] = name
+
+    def save(self) -> None:
+        """有新条目时保存缓存到文件(按LRU顺序)"""
+        if not self.path or not self.dirty:
+            return
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                data = {"entries": [[key, name] for key, name in self.entries.items()]}
+                json.dump(data, f, ensure_ascii=False)
+            self.dirty = False
+        except OSError as e:
+            logging.warning(f"名称缓存文件 {self.path} 保存失败: {e}")
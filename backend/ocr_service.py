@@ -0,0 +1,250 @@
+"""
+常驻本地OCR服务
+
+由若干工作进程组成进程池, 每个进程各自持有已加载的PaddleOCR模型, 模型加载开销只需支付一次,
+识别请求可分散到多个CPU核心。主程序与校准脚本通过 OcrClient 调用, 接口与 OcrEngines 一致。
+
+通信使用 multiprocessing.connection (本机TCP, 带authkey校验), Windows与Linux均可用。
+authkey 为每次安装随机生成的密钥, 保存在用户目录下仅当前用户可读写的文件中, 服务端与客户端都从该文件读取,
+其他用户无法连接服务(连接后收到的请求会被反序列化, 必须防止他人连接)。
+用法: python ocr_service.py [--workers N] [--preload ch,en]
+"""
+import argparse
+import logging
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import Pool
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ocr_utils import OcrEngines
+
+DEFAULT_ADDRESS = ("127.0.0.1", 47291)
+DEFAULT_AUTHKEY_FILE = Path.home() / ".delta-market" / "ocr_service.key"
+AUTHKEY_BYTES = 32
+SERVICE_SCRIPT = Path(__file__).resolve()
+
+# 工作进程内的模型实例
+_worker_engines: Optional[OcrEngines] = None
+
+
+def load_authkey(path: Path = DEFAULT_AUTHKEY_FILE) -> bytes:
+    """读取本机的服务密钥, 不存在时随机生成并以仅当前用户可读写的权限创建"""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    try:
+        # O_EXCL: 多个进程同时首次启动时只有一个能创建密钥文件
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o600)
+    except FileExistsError:
+        pass
+    else:
+        with os.fdopen(fd, "wb") as f:
+            f.write(secrets.token_hex(AUTHKEY_BYTES).encode("ascii"))
+    if os.name == "posix" and path.stat().st_mode & 0o077:
+        logging.warning(f"OCR服务密钥文件 {path} 可被其他用户访问, 已改为仅当前用户可读写")
+        os.chmod(path, 0o600)
+    # 其他进程刚创建文件尚未写入时稍等
+    deadline = time.perf_counter() + 1.0
+    while True:
+        key = path.read_bytes().strip()
+        if key or time.perf_counter() >= deadline:
+            break
+        time.sleep(0.01)
+    if not key:
+        raise ValueError(f"OCR服务密钥文件 {path} 为空, 请删除后重试")
+    return key
+
+
+def _init_worker(preload: Tuple[str, ...]) -> None:
+    """工作进程初始化: 创建模型管理器并预加载指定语言的模型"""
+    global _worker_engines
+    os.environ["PPOCR_LOG_LEVEL"] = "ERROR"
+    logging.getLogger("ppocr").setLevel(logging.ERROR)
+    _worker_engines = OcrEngines()
+    for lang in preload:
+        _worker_engines.get(lang)
+
+
+def _ocr_task(lang: str, options: Dict[str, Any], image: np.ndarray, rec_only: bool, cls: bool) -> Optional[Tuple[str, float]]:
+    if not _worker_engines.is_loaded(lang) and options:
+        _worker_engines.configure(lang, **options)
+    return _worker_engines.recognize(lang, image, rec_only=rec_only, cls=cls)
+
+
+def _ocr_batch_task(lang: str, options: Dict[str, Any], images: List[np.ndarray]) -> List[Optional[Tuple[str, float]]]:
+    if not _worker_engines.is_loaded(lang) and options:
+        _worker_engines.configure(lang, **options)
+    return _worker_engines.recognize_batch(lang, images)
+
+
+class OcrService:
+    """OCR服务端: 每个连接一个线程接收请求, 识别任务交给进程池执行"""
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey: Optional[bytes] = None, workers: int = 2, preload=("ch",)):
+        self.address = address
+        self.authkey = authkey if authkey is not None else load_authkey()
+        self.pool = Pool(processes=workers, initializer=_init_worker, initargs=(tuple(preload),))
+
+    def handle(self, request: Dict[str, Any]) -> Any:
+        op = request.get("op")
+        if op == "ping":
+            return "pong"
+        if op == "ocr":
+            return self.pool.apply(
+                _ocr_task,
+                (request["lang"], request.get("options", {}), request["image"], request.get("rec_only", False), request.get("cls", False)),
+            )
+        if op == "ocr_batch":
+            return self.pool.apply(_ocr_batch_task, (request["lang"], request.get("options", {}), request["images"]))
+        raise ValueError(f"未知的请求类型: {op}")
+
+    def _serve_connection(self, conn) -> None:
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    conn.send(("ok", self.handle(request)))
+                except Exception as e:
+                    conn.send(("error", str(e)))
+
+    def serve_forever(self) -> None:
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"OCR服务已启动: {self.address}")
+            while True:
+                conn = listener.accept()
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def close(self) -> None:
+        self.pool.terminate()
+
+
+class OcrClient:
+    """
+    OCR服务客户端, 接口与 OcrEngines 一致, 可直接替换
+
+    每个线程使用独立连接, 名称与价格识别线程的请求可在服务端并行处理
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey: Optional[bytes] = None):
+        self.address = tuple(address)
+        self.authkey = authkey if authkey is not None else load_authkey()
+        self.options: Dict[str, Dict[str, Any]] = {}
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """获取当前线程的连接, 不存在时新建"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = Client(self.address, authkey=self.authkey)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def connect_or_spawn(self, timeout: float = 120.0, workers: int = 2) -> None:
+        """连接服务, 服务未运行时在后台启动并等待其就绪"""
+        try:
+            self.connect()
+            return
+        except OSError:
+            pass
+        print("OCR服务未运行, 正在启动...")
+        creationflags = getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+        subprocess.Popen(
+            [sys.executable, str(SERVICE_SCRIPT), "--workers", str(workers),
+             "--host", self.address[0], "--port", str(self.address[1])],
+            cwd=str(SERVICE_SCRIPT.parent),
+            creationflags=creationflags,
+        )
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                self.connect()
+                self.call({"op": "ping"})
+                return
+            except OSError:
+                if time.perf_counter() >= deadline:
+                    raise
+                time.sleep(0.2)
+
+    def call(self, request: Dict[str, Any]) -> Any:
+        conn = self.connect()
+        conn.send(request)
+        status, result = conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"OCR服务错误: {result}")
+        return result
+
+    def configure(self, lang: str, **options: Any) -> None:
+        self.options[lang] = options
+
+    def recognize(self, lang: str, image: np.ndarray, rec_only: bool = False, cls: bool = False) -> Optional[Tuple[str, float]]:
+        return self.call({
+            "op": "ocr",
+            "lang": lang,
+            "options": self.options.get(lang, {}),
+            "image": np.ascontiguousarray(image),
+            "rec_only": rec_only,
+            "cls": cls,
+        })
+
+    def recognize_batch(self, lang: str, images: List[np.ndarray]) -> List[Optional[Tuple[str, float]]]:
+        return self.call({
+            "op": "ocr_batch",
+            "lang": lang,
+            "options": self.options.get(lang, {}),
+            "images": [np.ascontiguousarray(image) for image in images],
+        })
+
+    def warm_up(self, langs: Dict[str, bool]) -> threading.Thread:
+        """后台发送一次空白图像识别请求, 确保服务端模型已加载"""
+        def run() -> None:
+            dummy = np.full((32, 96), 255, dtype=np.uint8)
+            for lang, rec_only in langs.items():
+                try:
+                    self.recognize(lang, dummy, rec_only=rec_only)
+                except Exception as e:
+                    logging.warning(f"OCR服务预热失败: {str(e)}")
+
+        thread = threading.Thread(target=run, name="ocr-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="常驻本地OCR服务")
+    parser.add_argument("--host", default=DEFAULT_ADDRESS[0])
+    parser.add_argument("--port", type=int, default=DEFAULT_ADDRESS[1])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--preload", default="ch", help="启动时预加载的模型语言, 逗号分隔")
+    args = parser.parse_args()
+
+    preload = [lang for lang in args.preload.split(",") if lang]
+    service = OcrService((args.host, args.port), workers=args.workers, preload=preload)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""PaddleOCR调用封装"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def recognize(engine: Any, image: np.ndarray, rec_only: bool = False, cls: bool = False) -> Optional[Tuple[str, float]]:
+    """
+    识别图像中的第一段文字, 返回(文本, 置信度), 无结果时返回None
+
+    rec_only为True时跳过文本检测与方向分类, 将整张裁剪图直接送入识别模型,
+    适用于位置固定、文字不会旋转的小区域
+    """
+    if rec_only:
+        # 仅识别模式的结果格式: [[(文本, 置信度), ...]]
+        result = engine.ocr(image, det=False, cls=False)
+        if not result or not result[0]:
+            return None
+        text, score = result[0][0]
+    else:
+        # 检测+识别模式的结果格式: [[[文本框, (文本, 置信度)], ...]]
+        result = engine.ocr(image, cls=cls)
+        if not result or not result[0]:
+            return None
+        text, score = result[0][0][1]
+    if not text:
+        return None
+    return text, float(score)
+
+
+def recognize_batch(engine: Any, images: List[np.ndarray]) -> List[Optional[Tuple[str, float]]]:
+    """
+    仅识别模式下的批量识别, 所有裁剪图在一次调用中送入识别模型(按 rec_batch_num 分批推理),
+    返回与输入顺序一致的(文本, 置信度)列表
+    """
+    if not images:
+        return []
+    # 识别模型要求BGR三通道输入
+    bgr_images = [cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if image.ndim == 2 else image for image in images]
+    rec_res, _ = engine.text_recognizer(bgr_images)
+    return [(text, float(score)) if text else None for text, score in rec_res]
+
+
+class OcrEngines:
+    """
+    按需创建PaddleOCR模型
+
+    每种语言的模型在首次使用时才导入paddleocr并构建, 配置用不到的模型不会加载。
+    同一模型的推理由锁串行化, 后台预热与正式识别可以安全地同时发起。
+    """
+
+    def __init__(self):
+        self.options: Dict[str, Dict[str, Any]] = {}
+        self.load_times: Dict[str, float] = {}
+        self._engines: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._build_lock = threading.Lock()
+
+    def configure(self, lang: str, **options: Any) -> None:
+        """设置模型构建参数(需在首次使用前调用)"""
+        self.options[lang] = options
+
+    def is_loaded(self, lang: str) -> bool:
+        return lang in self._engines
+
+    def get(self, lang: str) -> Any:
+        """获取模型, 首次调用时构建"""
+        engine = self._engines.get(lang)
+        if engine is not None:
+            return engine
+        with self._build_lock:
+            engine = self._engines.get(lang)
+            if engine is None:
+                start = time.perf_counter()
+                from paddleocr import PaddleOCR
+                options = self.options.get(lang, {"use_angle_cls": True})
+                engine = PaddleOCR(lang=lang, **options)
+                self.load_times[lang] = time.perf_counter() - start
+                self._engines[lang] = engine
+                print(f"OCR模型 {lang} 加载完成, 耗时 {self.load_times[lang]:.2f} 秒")
+        return engine
+
+    def recognize(self, lang: str, image: np.ndarray, rec_only: bool = False, cls: bool = False) -> Optional[Tuple[str, float]]:
+        """使用指定语言的模型识别图像"""
+        engine = self.get(lang)
+        with self._locks[lang]:
+            return recognize(engine, image, rec_only=rec_only, cls=cls)
+
+    def recognize_batch(self, lang: str, images: List[np.ndarray]) -> List[Optional[Tuple[str, float]]]:
+        """使用指定语言的模型批量识别(仅识别模式)"""
+        engine = self.get(lang)
+        with self._locks[lang]:
+            return recognize_batch(engine, images)
+
+    def warm_up(self, langs: Dict[str, bool]) -> threading.Thread:
+        """
+        后台线程加载模型并执行一次空白图像推理, 使首次正式识别不必等待初始化
+
+        langs: {语言: 是否仅识别模式}
+        """
+        def run() -> None:
+            dummy = np.full((32, 96), 255, dtype=np.uint8)
+            for lang, rec_only in langs.items():
+                try:
+                    self.recognize(lang, dummy, rec_only=rec_only)
+                except Exception as e:
+                    logging.warning(f"OCR模型 {lang} 预热失败: {str(e)}")
+
+        thread = threading.Thread(target=run, name="ocr-warm-up", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,184 @@
+"""
+一次完成全部校准
+
+只截一次屏, 依次选择 名称区域 -> 价格区域 -> 购买按钮 -> 各门卡位置(可添加多张),
+全部完成后一次性原子写入 config.json。截屏前请打开任意门卡的详情面板, 使门卡列表与面板同时可见。
+每一步按 esc 跳过(保留原配置); 选择门卡位置时按 esc 结束添加。
+
+门卡名称: 按 --names 指定的顺序使用; 未指定时在控制台输入(直接回车使用括号中的默认值),
+第一张门卡的默认名称为名称区域的识别结果。已存在同名门卡时只更新其位置。
+
+用法: python calibrate.py [--names 门卡A,门卡B] [--steps name,price,button,cards]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+if sys.platform == "win32":
+    import ctypes
+    ctypes.windll.user32.ShowWindow(ctypes.windll.kernel32.GetConsoleWindow(), 1)
+
+SCRIPT_FILE = Path(__file__).resolve()
+BASE_DIR = SCRIPT_FILE.parent.parent.parent
+CONFIG_FILE = BASE_DIR / "config" / "config.json"
+
+sys.path.insert(0, str(SCRIPT_FILE.parent.parent))
+from card_locator import save_template, DEFAULT_TEMPLATES_DIR
+from config_io import save_json_atomic
+from geometry import to_reference_region, to_reference_fraction
+from selector import grab_screen, select_region, select_position
+
+STEPS = ("name", "price", "button", "cards")
+
+# 新增门卡的默认配置(与 card_name_region.py 一致)
+DEFAULT_KEY = {
+    "floating_percentage_range": 0.22,
+    "ideal_price": 200004,
+    "want_buy": 1,
+}
+
+
+def load_config() -> Dict[str, Any]:
+    try:
+        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"keys": []}
+
+
+def prompt(message: str, default: str) -> str:
+    """控制台输入, 非交互环境直接返回默认值"""
+    if not sys.stdin.isatty():
+        return default
+    print(f"{message} [{default}]: ", end="", file=sys.stderr, flush=True)
+    return input().strip() or default
+
+
+class CalibrationSession:
+    """在同一张截图上收集校准结果, 结束时统一写入配置"""
+
+    def __init__(self, config: Dict[str, Any], screen):
+        self.config = config
+        self.screen = screen
+        height, width = screen.shape[:2]
+        self.screen_size: Tuple[int, int] = (width, height)
+        self.changes: List[str] = []
+
+    def set_region(self, key: str, region: List[int]) -> None:
+        self.config[key] = to_reference_region(self.config, region, self.screen_size)
+        self.changes.append(key)
+
+    def set_purchase_button(self, point: Tuple[int, int]) -> None:
+        self.config["purchase_btn_location"] = to_reference_fraction(self.config, point, self.screen_size)
+        self.changes.append("purchase_btn_location")
+
+    def set_card(self, name: str, point: Tuple[int, int]) -> Dict[str, Any]:
+        """设置门卡位置, 没有同名门卡时新增"""
+        position = to_reference_fraction(self.config, point, self.screen_size)
+        keys = self.config.setdefault("keys", [])
+        key = next((k for k in keys if k.get("name") == name), None)
+        if key is None:
+            key = dict(DEFAULT_KEY, name=name)
+            keys.append(key)
+        key["position"] = position
+        self.changes.append(f"keys[{name}]")
+
+        # 启用门卡定位器时, 从同一张截图保存参考图标
+        locator_config = self.config.get("card_locator", {})
+        if locator_config.get("enabled", False):
+            templates_dir = Path(locator_config.get("templates_dir") or DEFAULT_TEMPLATES_DIR)
+            save_template(self.screen, point, tuple(locator_config.get("icon_size", [96, 96])), name, templates_dir)
+        return key
+
+    def save(self) -> None:
+        save_json_atomic(CONFIG_FILE, self.config)
+
+
+def recognize_name(config: Dict[str, Any], region: List[int], screen) -> Optional[str]:
+    """识别名称区域内的文字, OCR不可用时返回None"""
+    try:
+        from card_name_region import capture_and_ocr
+        return capture_and_ocr(config, region, screen) or None
+    except Exception as e:
+        print(f"名称识别失败: {e}", file=sys.stderr)
+        return None
+
+
+def main() -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="一次完成全部校准")
+    parser.add_argument("--names", default="", help="门卡名称, 逗号分隔, 按选择顺序对应")
+    parser.add_argument("--steps", default=",".join(STEPS), help="要执行的步骤")
+    args = parser.parse_args()
+    names = [name for name in args.names.split(",") if name]
+    steps = [step for step in args.steps.split(",") if step in STEPS]
+
+    output: Dict[str, Any] = {"success": False}
+    session = CalibrationSession(load_config(), grab_screen())
+    ocr_text = None
+
+    if "name" in steps:
+        print("选择门卡名称区域(esc跳过)", file=sys.stderr)
+        region = select_region(session.screen, "Name Region")
+        if region:
+            session.set_region("card_name_range", region)
+            ocr_text = recognize_name(session.config, region, session.screen)
+            output["ocr_text"] = ocr_text
+
+    if "price" in steps:
+        print("选择门卡价格区域(esc跳过)", file=sys.stderr)
+        region = select_region(session.screen, "Price Region")
+        if region:
+            session.set_region("card_price_range", region)
+
+    if "button" in steps:
+        print("点击购买按钮位置(esc跳过)", file=sys.stderr)
+        point = select_position(session.screen, "Purchase Button")
+        if point:
+            session.set_purchase_button(point)
+
+    if "cards" in steps:
+        existing = [key.get("name", "") for key in session.config.get("keys", [])]
+        cards = []
+        while True:
+            index = len(cards)
+            print(f"点击第 {index + 1} 张门卡的位置(esc结束)", file=sys.stderr)
+            point = select_position(session.screen, f"Card {index + 1}")
+            if not point:
+                break
+            if index < len(names):
+                name = names[index]
+            else:
+                default = existing[index] if index < len(existing) else f"门卡{index + 1}"
+                if index == 0 and ocr_text:
+                    default = ocr_text
+                name = prompt(f"第 {index + 1} 张门卡名称", default)
+            session.set_card(name, point)
+            cards.append({"name": name, "point": list(point)})
+        output["cards"] = cards
+
+    if not session.changes:
+        output["error"] = "用户取消选择"
+        return output
+
+    session.save()
+    output.update({
+        "success": True,
+        "changes": session.changes,
+        "config": session.config,
+    })
+    return output
+
+
+if __name__ == "__main__":
+    try:
+        result = main()
+        exit_code = 0 if result.get("success") else 1
+        sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+    except Exception as e:
+        sys.stdout.write(json.dumps({"success": False, "error": str(e)}) + "\n")
+        exit_code = 1
+    finally:
+        sys.stdout.flush()
+    sys.exit(exit_code)
@@ -1,5 +1,4 @@
 import pyautogui
-import keyboard
 import json
 import time
 from pathlib import Path
@@ -28,6 +27,14 @@ CONFIG_FILE = CONFIG_DIR / "config.json"
 TEMP_DIR = BASE_DIR / "temp"
 TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
+# 复用主程序的图像预处理, 使校准时识别的图像与运行时一致
+sys.path.insert(0, str(SCRIPT_FILE.parent.parent))
+from image_utils import binarize, NAME_THRESHOLD
+from ocr_service import OcrClient
+from config_io import save_json_atomic
+from geometry import to_reference_region
+from selector import select_region
+
 pyautogui.PAUSE = 0.1
 pyautogui.FAILSAFE = True
 
@@ -45,79 +52,38 @@ def load_config(file_path=CONFIG_FILE):
         }
 
 def save_config(config, file_path=CONFIG_FILE):
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(config, f, ensure_ascii=False, indent=4)
+    save_json_atomic(file_path, config, indent=4)
 
-def select_region_with_drag(region_name):
-    screenshot = np.array(ImageGrab.grab())
-    original_h, original_w = screenshot.shape[:2]
-    darkened = cv2.addWeighted(screenshot, 0.7, np.zeros_like(screenshot), 0.3, 0)
-    cv2.namedWindow("Region Selector", cv2.WND_PROP_FULLSCREEN)
-    cv2.setWindowProperty("Region Selector", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-    
-    selecting = False
-    start_pos = None
-    current_pos = None
-    selection = None
-    
-    def on_mouse(event, x, y, flags, param):
-        nonlocal selecting, start_pos, current_pos, selection
-        
-        if event == cv2.EVENT_LBUTTONDOWN:
-            selecting = True
-            start_pos = (x, y)
-            current_pos = (x, y)
-        elif event == cv2.EVENT_MOUSEMOVE:
-            if selecting:
-                current_pos = (x, y)
-        elif event == cv2.EVENT_LBUTTONUP:
-            selecting = False
-            current_pos = (x, y)
-            x1, y1 = start_pos
-            x2, y2 = current_pos
-            if x2 < x1:
-                x1, x2 = x2, x1
-            if y2 < y1:
-                y1, y2 = y2, y1
-            selection = [x1, y1, x2-x1, y2-y1]
-    
-    cv2.setMouseCallback("Region Selector", on_mouse)
-    
-    while True:
-        display_img = darkened.copy()
-        
-        if start_pos and current_pos:
-            x1, y1 = start_pos
-            x2, y2 = current_pos
-            
-            if x2 < x1:
-                x1, x2 = x2, x1
-            if y2 < y1:
-                y1, y2 = y2, y1
-                
-            display_img[y1:y2, x1:x2] = screenshot[y1:y2, x1:x2]
-            cv2.rectangle(display_img, (x1, y1), (x2, y2), (0, 0, 255), 2)
-        
-        cv2.imshow("Region Selector", display_img)
-        
-        if selection is not None:
-            break
-        if cv2.waitKey(10) == 27 or keyboard.is_pressed('esc'):
-            break
-    
-    cv2.destroyAllWindows()
-    return selection
-
-def capture_and_ocr(config):
-    x, y, w, h = config["card_name_range"]
-    screenshot = ImageGrab.grab(bbox=(x, y, x+w, y+h))
+def capture_and_ocr(config, region, screen=None):
+    """识别区域内的门卡名称, 提供整屏截图screen时直接从中裁剪, 不再重新截图"""
+    x, y, w, h = region
+    if screen is not None:
+        screenshot = screen[y:y+h, x:x+w]
+    else:
+        screenshot = ImageGrab.grab(bbox=(x, y, x+w, y+h))
+    binary = binarize(np.asarray(screenshot), NAME_THRESHOLD)
     screenshot_path = TEMP_DIR / "card_name_range.png"
-    screenshot.save(screenshot_path)
+    cv2.imwrite(str(screenshot_path), binary)
+    
+    # 优先使用常驻OCR服务(与主程序识别结果一致), 服务不可用时使用tesseract
+    service_config = config.get("ocr_service", {})
+    if service_config.get("enabled", False):
+        client = None
+        try:
+            client = OcrClient(tuple(service_config.get("address", ("127.0.0.1", 47291))))
+            client.connect_or_spawn(workers=service_config.get("workers", 2))
+            result = client.recognize("ch", binary, rec_only=config.get("ocr_rec_only", {}).get("card_name_range", False), cls=True)
+            if result:
+                return result[0].replace(" ", "").strip()
+        except Exception:
+            pass
+        finally:
+            if client is not None:
+                client.close()
     
     try:
         custom_config = r'--oem 3 --psm 6 -l chi_sim'
-        text = pytesseract.image_to_string(screenshot, config=custom_config)
+        text = pytesseract.image_to_string(binary, config=custom_config)
         cleaned_text = text.replace(" ", "").replace("\n", "")
         return cleaned_text
     except Exception as e:
@@ -128,13 +94,14 @@ def main():
     output = {"success": False}
     
     try:
-        region = select_region_with_drag("名称区域")
+        region = select_region()
         if not region:
             output["error"] = "用户取消选择"
             return output
             
-        config["card_name_range"] = region
-        ocr_text = capture_and_ocr(config)
+        ocr_text = capture_and_ocr(config, region)
+        # 按参考分辨率保存区域
+        config["card_name_range"] = to_reference_region(config, region, tuple(pyautogui.size()))
         
         # ✅ 关键优化：更新 keys 最后一个元素的 name 字段
         if "keys" not in config or not isinstance(config["keys"], list):
@@ -159,7 +126,7 @@ def main():
         
         output.update({
             "success": True,
-            "region": region,
+            "region": config["card_name_range"],
             "ocr_text": ocr_text,
             "config": config
         })
@@ -1,10 +1,6 @@
 import pyautogui
-import keyboard
 import json
 import sys
-import numpy as np
-import cv2
-from PIL import ImageGrab
 from pathlib import Path
 
 if sys.platform == "win32":
@@ -19,6 +15,13 @@ CONFIG_FILE = CONFIG_DIR / "config.json"
 TEMP_DIR = BASE_DIR / "temp"
 TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
+# 复用主程序的门卡定位器模板保存
+sys.path.insert(0, str(SCRIPT_FILE.parent.parent))
+from card_locator import save_template, DEFAULT_TEMPLATES_DIR
+from config_io import save_json_atomic
+from geometry import to_reference_fraction
+from selector import grab_screen, select_position
+
 # 设置pyautogui参数
 pyautogui.PAUSE = 0.1
 pyautogui.FAILSAFE = True
@@ -33,43 +36,7 @@ def load_config():
 
 def save_config(config):
     """保存配置文件"""
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=4, ensure_ascii=False)
-
-def select_position():
-    """通过鼠标点击选择屏幕位置"""
-    screenshot = np.array(ImageGrab.grab())
-    darkened = cv2.addWeighted(screenshot, 0.7, np.zeros_like(screenshot), 0.3, 0)
-    
-    cv2.namedWindow("Position Selector", cv2.WND_PROP_FULLSCREEN)
-    cv2.setWindowProperty("Position Selector", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-    
-    position = None
-    
-    def on_mouse(event, x, y, flags, param):
-        nonlocal position
-        if event == cv2.EVENT_LBUTTONDOWN:
-            position = (x, y)
-    
-    cv2.setMouseCallback("Position Selector", on_mouse)
-    
-    while position is None:
-        display_img = darkened.copy()
-        cv2.imshow("Position Selector", display_img)
-        
-        if cv2.waitKey(10) == 27 or keyboard.is_pressed('esc'):
-            break
-    
-    cv2.destroyAllWindows()
-    
-    if position:
-        screen_width, screen_height = pyautogui.size()
-        return [
-            round(position[0] / screen_width, 4),
-            round(position[1] / screen_height, 4)
-        ]
-    return None
+    save_json_atomic(CONFIG_FILE, config, indent=4)
 
 def main():
     """主函数"""
@@ -77,15 +44,27 @@ def main():
     config = load_config()
     
     try:
-        new_position = select_position()
-        if not new_position:
+        # 选择位置与保存参考图标使用同一张截图(选择窗口关闭后画面可能仍残留遮罩或未重绘完成)
+        screenshot = grab_screen()
+        center = select_position(screenshot)
+        if not center:
             output["error"] = "用户取消选择"
             return output
             
         if not config.get('keys'):
             config['keys'] = [{}]
+        # 按参考分辨率保存位置
+        screen_width, screen_height = pyautogui.size()
+        new_position = to_reference_fraction(config, center, (screen_width, screen_height))
         config['keys'][0]['position'] = new_position
         save_config(config)
+
+        # 启用门卡定位器时, 以所选位置为中心保存参考图标
+        locator_config = config.get("card_locator", {})
+        card_name = config['keys'][0].get('name')
+        if locator_config.get("enabled", False) and card_name:
+            templates_dir = Path(locator_config.get("templates_dir") or DEFAULT_TEMPLATES_DIR)
+            output["template"] = str(save_template(screenshot, center, tuple(locator_config.get("icon_size", [96, 96])), card_name, templates_dir))
         
         output.update({
             "success": True,
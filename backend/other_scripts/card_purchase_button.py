@@ -1,10 +1,6 @@
 import pyautogui
-import keyboard
 import json
 import sys
-import numpy as np
-import cv2
-from PIL import ImageGrab
 from pathlib import Path
 
 if sys.platform == "win32":
@@ -19,6 +15,12 @@ CONFIG_FILE = CONFIG_DIR / "config.json"
 TEMP_DIR = BASE_DIR / "temp"
 TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
+# 复用主程序的几何模型换算位置
+sys.path.insert(0, str(SCRIPT_FILE.parent.parent))
+from config_io import save_json_atomic
+from geometry import to_reference_fraction
+from selector import select_position
+
 # 设置pyautogui参数
 pyautogui.PAUSE = 0.1
 pyautogui.FAILSAFE = True
@@ -40,43 +42,7 @@ def load_config():
 
 def save_config(config):
     """保存配置文件"""
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        json.dump(config, f, ensure_ascii=False, indent=4)
-
-def select_position():
-    """选择购买按钮位置"""
-    screenshot = np.array(ImageGrab.grab())
-    darkened = cv2.addWeighted(screenshot, 0.7, np.zeros_like(screenshot), 0.3, 0)
-    
-    cv2.namedWindow("Position Selector", cv2.WND_PROP_FULLSCREEN)
-    cv2.setWindowProperty("Position Selector", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-    
-    position = None
-    
-    def on_mouse(event, x, y, flags, param):
-        nonlocal position
-        if event == cv2.EVENT_LBUTTONDOWN:
-            position = (x, y)
-    
-    cv2.setMouseCallback("Position Selector", on_mouse)
-    
-    while position is None:
-        display_img = darkened.copy()
-        cv2.imshow("Position Selector", display_img)
-        
-        if cv2.waitKey(10) == 27 or keyboard.is_pressed('esc'):
-            break
-    
-    cv2.destroyAllWindows()
-    
-    if position:
-        screen_width, screen_height = pyautogui.size()
-        return [
-            round(position[0] / screen_width, 4),
-            round(position[1] / screen_height, 4)
-        ]
-    return None
+    save_json_atomic(CONFIG_FILE, config, indent=4)
 
 def main():
     """主函数"""
@@ -84,11 +50,14 @@ def main():
     config = load_config()
     
     try:
-        position = select_position()
-        if not position:
+        point = select_position()
+        if not point:
             output["error"] = "用户取消选择"
             return output
             
+        # 按参考分辨率保存位置
+        screen_width, screen_height = pyautogui.size()
+        position = to_reference_fraction(config, point, (screen_width, screen_height))
         config["purchase_btn_location"] = position
         save_config(config)
         
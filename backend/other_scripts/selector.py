@@ -0,0 +1,194 @@
+"""
+校准脚本共用的全屏区域/位置选择窗口
+
+遮罩画面只在首次显示时生成一次, 拖动选框时仅恢复并重绘上一帧选框与当前选框覆盖的矩形,
+画面没有变化的轮询周期直接跳过, 不再每10ms复制整张截图。
+
+测量每帧合成耗时(不打开窗口):
+    python selector.py --bench [--size 3840x2160] [--steps 300]
+"""
+import argparse
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+Rect = Tuple[int, int, int, int]  # (x1, y1, x2, y2)
+
+BORDER_COLOR = (0, 0, 255)
+BORDER_THICKNESS = 2
+DIM_ALPHA = 0.7  # 遮罩亮度
+
+
+def grab_screen() -> np.ndarray:
+    from PIL import ImageGrab
+    return np.array(ImageGrab.grab())
+
+
+def esc_pressed(key: int) -> bool:
+    """窗口内按下esc或全局按下esc"""
+    if key == 27:
+        return True
+    import keyboard
+    return keyboard.is_pressed('esc')
+
+
+def normalize_rect(start: Tuple[int, int], end: Tuple[int, int]) -> Rect:
+    x1, x2 = sorted((start[0], end[0]))
+    y1, y2 = sorted((start[1], end[1]))
+    return x1, y1, x2, y2
+
+
+class RegionOverlay:
+    """选框遮罩画面, 只重绘发生变化的矩形"""
+
+    def __init__(self, screenshot: np.ndarray):
+        self.screenshot = screenshot
+        self.darkened = cv2.addWeighted(screenshot, DIM_ALPHA, np.zeros_like(screenshot), 1 - DIM_ALPHA, 0)
+        self.canvas = self.darkened.copy()
+        self.rect: Optional[Rect] = None
+        self.frame_times: List[float] = []  # 每次合成耗时(ms)
+
+    def _padded(self, rect: Rect) -> Rect:
+        """选框及其边框线覆盖的矩形(裁剪到画面内)"""
+        height, width = self.canvas.shape[:2]
+        pad = BORDER_THICKNESS
+        x1, y1, x2, y2 = rect
+        return max(0, x1 - pad), max(0, y1 - pad), min(width, x2 + pad + 1), min(height, y2 + pad + 1)
+
+    def update(self, rect: Optional[Rect]) -> bool:
+        """将选框更新为rect, 画面有变化时返回True"""
+        if rect == self.rect:
+            return False
+        start = time.perf_counter()
+        boxes = [self._padded(r) for r in (self.rect, rect) if r is not None]
+        x1 = min(b[0] for b in boxes)
+        y1 = min(b[1] for b in boxes)
+        x2 = max(b[2] for b in boxes)
+        y2 = max(b[3] for b in boxes)
+        # 恢复脏矩形内的遮罩, 再贴上选框内的原图与边框
+        self.canvas[y1:y2, x1:x2] = self.darkened[y1:y2, x1:x2]
+        if rect is not None:
+            rx1, ry1, rx2, ry2 = rect
+            self.canvas[ry1:ry2, rx1:rx2] = self.screenshot[ry1:ry2, rx1:rx2]
+            cv2.rectangle(self.canvas, (rx1, ry1), (rx2, ry2), BORDER_COLOR, BORDER_THICKNESS)
+        self.rect = rect
+        self.frame_times.append((time.perf_counter() - start) * 1000)
+        return True
+
+
+def _open_window(name: str) -> None:
+    cv2.namedWindow(name, cv2.WND_PROP_FULLSCREEN)
+    cv2.setWindowProperty(name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+
+def select_region(screenshot: Optional[np.ndarray] = None, window_name: str = "Region Selector") -> Optional[List[int]]:
+    """拖动鼠标选择区域, 返回 [x, y, w, h], 按esc取消时返回None"""
+    if screenshot is None:
+        screenshot = grab_screen()
+    overlay = RegionOverlay(screenshot)
+    _open_window(window_name)
+
+    selecting = False
+    start_pos = None
+    current_pos = None
+    selection = None
+
+    def on_mouse(event, x, y, flags, param):
+        nonlocal selecting, start_pos, current_pos, selection
+        if event == cv2.EVENT_LBUTTONDOWN:
+            selecting = True
+            start_pos = (x, y)
+            current_pos = (x, y)
+        elif event == cv2.EVENT_MOUSEMOVE:
+            if selecting:
+                current_pos = (x, y)
+        elif event == cv2.EVENT_LBUTTONUP and start_pos is not None:
+            selecting = False
+            current_pos = (x, y)
+            x1, y1, x2, y2 = normalize_rect(start_pos, current_pos)
+            selection = [x1, y1, x2 - x1, y2 - y1]
+
+    cv2.setMouseCallback(window_name, on_mouse)
+    cv2.imshow(window_name, overlay.canvas)
+
+    while selection is None:
+        if start_pos and current_pos and overlay.update(normalize_rect(start_pos, current_pos)):
+            cv2.imshow(window_name, overlay.canvas)
+        if esc_pressed(cv2.waitKey(10)):
+            break
+
+    cv2.destroyWindow(window_name)
+    cv2.waitKey(1)
+    return selection
+
+
+def select_position(screenshot: Optional[np.ndarray] = None, window_name: str = "Position Selector") -> Optional[Tuple[int, int]]:
+    """点击选择屏幕位置, 返回像素坐标 (x, y), 按esc取消时返回None"""
+    if screenshot is None:
+        screenshot = grab_screen()
+    overlay = RegionOverlay(screenshot)
+    _open_window(window_name)
+
+    position = None
+
+    def on_mouse(event, x, y, flags, param):
+        nonlocal position
+        if event == cv2.EVENT_LBUTTONDOWN:
+            position = (x, y)
+
+    cv2.setMouseCallback(window_name, on_mouse)
+    # 画面不会变化, 只需显示一次
+    cv2.imshow(window_name, overlay.canvas)
+
+    while position is None:
+        if esc_pressed(cv2.waitKey(10)):
+            break
+
+    cv2.destroyWindow(window_name)
+    cv2.waitKey(1)
+    return position
+
+
+def bench(size: Tuple[int, int], steps: int) -> None:
+    """模拟一次拖动, 对比每帧复制整张遮罩与只重绘变化矩形的合成耗时"""
+    width, height = size
+    screenshot = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    overlay = RegionOverlay(screenshot)
+    start = (width // 4, height // 4)
+    path = [(start[0] + i * width // (2 * steps), start[1] + i * height // (2 * steps)) for i in range(1, steps + 1)]
+
+    full_times = []
+    for end in path:
+        t0 = time.perf_counter()
+        display_img = overlay.darkened.copy()
+        x1, y1, x2, y2 = normalize_rect(start, end)
+        display_img[y1:y2, x1:x2] = screenshot[y1:y2, x1:x2]
+        cv2.rectangle(display_img, (x1, y1), (x2, y2), BORDER_COLOR, BORDER_THICKNESS)
+        full_times.append((time.perf_counter() - t0) * 1000)
+
+    for end in path:
+        overlay.update(normalize_rect(start, end))
+    # 鼠标静止时的轮询周期不重绘
+    idle_start = time.perf_counter()
+    for _ in range(steps):
+        overlay.update(overlay.rect)
+    idle_ms = (time.perf_counter() - idle_start) * 1000 / steps
+
+    for label, times in (("整帧复制", full_times), ("脏矩形重绘", overlay.frame_times)):
+        data = np.array(times)
+        print(f"{label} | {width}x{height} | 帧数: {len(data)} | 平均: {data.mean():.2f} ms | p95: {np.percentile(data, 95):.2f} ms")
+    print(f"鼠标静止时每次轮询: {idle_ms * 1000:.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="区域选择窗口")
+    parser.add_argument("--bench", action="store_true", help="测量遮罩合成耗时")
+    parser.add_argument("--size", default="3840x2160")
+    parser.add_argument("--steps", type=int, default=300)
+    args = parser.parse_args()
+    if args.bench:
+        bench(tuple(int(v) for v in args.size.split("x")), args.steps)
+    else:
+        print(select_region())
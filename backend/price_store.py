@@ -0,0 +1,164 @@
+"""
+门卡价格观测记录库
+
+每次价格观测(时间戳, 门卡名称, 价格, 溢价率, 识别置信度)写入本地SQLite数据库,
+用于查看价格走势和设置理想价格。写入由后台线程批量提交, 不阻塞购买流程;
+数据库使用WAL模式并开启内存映射读取, 按 (门卡, 时间) 建立索引, 常用查询只扫描索引范围。
+
+命令行用法(查看各门卡近期价格统计):
+    python price_store.py [--hours 24] [--card 门卡名称]
+"""
+import argparse
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from log_writer import BatchWriter
+
+DEFAULT_DB_FILE = Path(__file__).parent.resolve() / "prices.db"
+MMAP_SIZE = 64 * 1024 * 1024  # 内存映射读取的上限字节数
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    ts REAL NOT NULL,
+    card TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    premium REAL,
+    confidence REAL
+);
+CREATE INDEX IF NOT EXISTS idx_observations_card_ts ON observations (card, ts);
+"""
+
+Observation = Tuple[float, str, int, Optional[float], Optional[float]]
+
+
+class PriceStore(BatchWriter):
+    """价格观测记录库, 写入由后台线程批量提交, 查询直接读取数据库"""
+
+    thread_name = "price-store"
+
+    def __init__(self, path: Path = DEFAULT_DB_FILE, flush_interval: float = 1.0, max_batch: int = 500):
+        self.path = Path(path)
+        self._conn = self._connect(self.path)
+        self._lock = threading.Lock()
+        super().__init__(flush_interval=flush_interval, max_batch=max_batch)
+
+    @staticmethod
+    def _connect(path: Path) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    # ---------- 写入 ----------
+
+    def add(self, card: str, price: int, premium: Optional[float] = None,
+            confidence: Optional[float] = None, ts: Optional[float] = None) -> None:
+        """记录一次价格观测(放入队列, 由后台线程写入)"""
+        self._put((ts if ts is not None else time.time(), card, int(price), premium, confidence))
+
+    def _write_batch(self, batch: Sequence[Observation]) -> None:
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO observations (ts, card, price, premium, confidence) VALUES (?, ?, ?, ?, ?)",
+                    batch,
+                )
+        except sqlite3.Error as e:
+            logging.error(f"写入价格记录失败: {e}")
+
+    def close(self) -> None:
+        """写完剩余记录并关闭数据库"""
+        super().close()
+        with self._lock:
+            self._conn.close()
+
+    # ---------- 查询 ----------
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def cards(self) -> List[str]:
+        """所有有观测记录的门卡名称"""
+        return [row[0] for row in self._query("SELECT DISTINCT card FROM observations ORDER BY card")]
+
+    def last_n(self, card: str, n: int = 20) -> List[Observation]:
+        """最近 n 条观测, 按时间从新到旧"""
+        return self._query(
+            "SELECT ts, card, price, premium, confidence FROM observations "
+            "WHERE card = ? ORDER BY ts DESC LIMIT ?",
+            (card, n),
+        )
+
+    def prices_since(self, card: str, seconds: float) -> np.ndarray:
+        """最近 seconds 秒内的价格序列, 按时间从旧到新"""
+        rows = self._query(
+            "SELECT price FROM observations WHERE card = ? AND ts >= ? ORDER BY ts",
+            (card, time.time() - seconds),
+        )
+        return np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+
+    def window_stats(self, card: str, seconds: float) -> Dict[str, Optional[float]]:
+        """最近 seconds 秒内的观测次数与最低/中位/最高价格"""
+        prices = self.prices_since(card, seconds)
+        if prices.size == 0:
+            return {"count": 0, "min": None, "median": None, "max": None}
+        return {
+            "count": int(prices.size),
+            "min": int(prices.min()),
+            "median": float(np.median(prices)),
+            "max": int(prices.max()),
+        }
+
+    def percentiles(self, card: str, seconds: float, qs: Sequence[float] = (10, 25, 50, 75, 90)) -> Dict[float, float]:
+        """最近 seconds 秒内的价格分位数"""
+        prices = self.prices_since(card, seconds)
+        if prices.size == 0:
+            return {}
+        return {q: float(v) for q, v in zip(qs, np.percentile(prices, qs))}
+
+    def rolling(self, card: str, seconds: float, window: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """最近 seconds 秒内价格的滑动最低价与滑动中位数(每个值对应以该观测结尾的 window 条记录)"""
+        prices = self.prices_since(card, seconds)
+        if prices.size < window:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        windows = np.lib.stride_tricks.sliding_window_view(prices, window)
+        return windows.min(axis=1), np.median(windows, axis=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="查看门卡价格观测统计")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_FILE, help="数据库文件路径")
+    parser.add_argument("--hours", type=float, default=24.0, help="统计最近多少小时的记录")
+    parser.add_argument("--card", help="只显示指定门卡")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"数据库不存在: {args.db}")
+        return
+    store = PriceStore(args.db)
+    try:
+        seconds = args.hours * 3600
+        for card in ([args.card] if args.card else store.cards()):
+            stats = store.window_stats(card, seconds)
+            if not stats["count"]:
+                continue
+            p = store.percentiles(card, seconds, (10, 50, 90))
+            print(
+                f"{card} | 观测: {stats['count']} | 最低: {stats['min']} | 中位: {stats['median']:.0f} | "
+                f"最高: {stats['max']} | P10: {p[10]:.0f} | P90: {p[90]:.0f}"
+            )
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
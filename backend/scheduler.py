@@ -0,0 +1,91 @@
+"""
+门卡自适应轮询调度
+
+以"下次检查时间"为键的小顶堆管理待检查门卡: 最近价格接近购买阈值的门卡检查间隔短,
+价格远高于阈值的门卡逐步放宽检查间隔, 尚无价格记录的门卡按最短间隔检查。
+间隔根据最近几次价格中的最低价相对最高可接受价格的差距, 在 min_interval 与 max_interval 之间线性取值。
+"""
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from cards import CardRecord
+
+
+class PollScheduler:
+    """按价格接近程度安排门卡检查顺序与间隔"""
+
+    def __init__(self, cards: List[CardRecord], min_interval: float = 0.0, max_interval: float = 5.0,
+                 near_gap: float = 0.05, far_gap: float = 0.5, history: int = 5,
+                 clock: Callable[[], float] = time.monotonic):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.near_gap = near_gap  # 价格高出阈值的比例不超过该值时按最短间隔检查
+        self.far_gap = far_gap  # 价格高出阈值的比例达到该值时按最长间隔检查
+        self.history = history
+        self.clock = clock
+        self.prices: Dict[str, Deque[int]] = {}
+        self._heap: List[Tuple[float, int, CardRecord]] = []
+        self._counter = itertools.count()  # 下次检查时间相同时按加入顺序排列
+        now = clock()
+        for card in cards:
+            self._push(card, now)
+
+    @classmethod
+    def from_config(cls, cards: List[CardRecord], config: Dict[str, Any],
+                    clock: Callable[[], float] = time.monotonic) -> "PollScheduler":
+        return cls(
+            cards,
+            min_interval=config.get("min_interval", 0.0),
+            max_interval=config.get("max_interval", 5.0),
+            near_gap=config.get("near_gap", 0.05),
+            far_gap=config.get("far_gap", 0.5),
+            history=config.get("history", 5),
+            clock=clock,
+        )
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _push(self, card: CardRecord, due: float) -> None:
+        heapq.heappush(self._heap, (due, next(self._counter), card))
+
+    def observe(self, card: CardRecord, price: int) -> None:
+        """记录一次价格观测"""
+        history = self.prices.get(card.name)
+        if history is None:
+            history = self.prices[card.name] = deque(maxlen=self.history)
+        history.append(price)
+
+    def interval(self, card: CardRecord) -> float:
+        """根据最近价格计算该门卡的检查间隔(秒)"""
+        history = self.prices.get(card.name)
+        if not history or card.max_price <= 0:
+            return self.min_interval
+        gap = (min(history) - card.max_price) / card.max_price
+        if gap <= self.near_gap:
+            return self.min_interval
+        if gap >= self.far_gap:
+            return self.max_interval
+        ratio = (gap - self.near_gap) / (self.far_gap - self.near_gap)
+        return self.min_interval + ratio * (self.max_interval - self.min_interval)
+
+    def time_until_due(self) -> Optional[float]:
+        """距离下一张门卡到期的秒数, 没有门卡时返回None"""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self.clock())
+
+    def pop_due(self, limit: int = 1) -> List[CardRecord]:
+        """取出最多 limit 张已到期的门卡, 检查完成后需调用 reschedule 放回"""
+        now = self.clock()
+        due = []
+        while self._heap and len(due) < limit and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def reschedule(self, card: CardRecord) -> None:
+        """按当前间隔安排该门卡的下次检查"""
+        self._push(card, self.clock() + self.interval(card))
@@ -0,0 +1,69 @@
+"""
+基于画面变化的界面就绪检测
+
+以小区域缩略图作为像素签名高频轮询, 签名相对基准发生明显变化且连续几次保持稳定时
+认为界面已完成渲染, 代替固定的 time.sleep 等待
+"""
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from capture import CaptureBackend, Region
+from image_utils import to_gray
+
+SIGNATURE_SIZE = (16, 8)  # 签名缩略图尺寸(宽, 高)
+
+
+class ScreenWaiter:
+    """轮询区域像素签名, 等待画面变化并稳定"""
+
+    def __init__(
+        self,
+        backend: CaptureBackend,
+        region: Region,
+        timeout: float = 0.5,
+        poll_interval: float = 0.005,
+        min_diff: float = 8.0,
+        stable_frames: int = 2,
+    ):
+        self.backend = backend
+        self.region = region
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.min_diff = min_diff  # 签名平均灰度差超过该值视为画面已变化
+        self.stable_frames = stable_frames  # 变化后需连续保持不变的轮询次数
+        self.timeouts = 0
+
+    def signature(self) -> np.ndarray:
+        """截取区域并缩放为灰度缩略图"""
+        gray = to_gray(self.backend.grab(self.region))
+        return cv2.resize(gray, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    @staticmethod
+    def diff(a: np.ndarray, b: np.ndarray) -> float:
+        return float(np.abs(a - b).mean())
+
+    def wait_for_change(self, baseline: np.ndarray) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        等待区域相对baseline发生变化并稳定, 返回(是否在超时前就绪, 最新签名)
+        """
+        deadline = time.perf_counter() + self.timeout
+        last = None
+        stable = 0
+        while True:
+            current = self.signature()
+            if self.diff(current, baseline) >= self.min_diff:
+                # 与上一帧几乎相同则计为稳定一次, 避免在过渡动画中途截图
+                if last is not None and self.diff(current, last) < 1.0:
+                    stable += 1
+                    if stable >= self.stable_frames:
+                        return True, current
+                else:
+                    stable = 0
+            last = current
+            if time.perf_counter() >= deadline:
+                self.timeouts += 1
+                return False, current
+            time.sleep(self.poll_interval)
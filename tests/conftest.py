@@ -0,0 +1,149 @@
+"""
+测试公共部分: 生成回放场景画面, 假OCR引擎与测试配置
+
+不需要游戏, 桌面与PaddleOCR。场景画面为同一分辨率的整屏图像:
+0.png 为门卡列表画面, 1.png 为打开详情面板后的画面(名称与价格区域各不相同),
+假OCR按二值化后的区域图像查表返回识别结果, 场景中写入的名称与价格即为"识别"结果。
+"""
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pytest
+from PIL import Image
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "benchmarks"))
+
+from geometry import Geometry  # noqa: E402
+from image_utils import NAME_THRESHOLD, PRICE_THRESHOLD, binarize  # noqa: E402
+
+SCREEN_SIZE = (1920, 1080)
+REGION_THRESHOLDS = {"card_name_range": NAME_THRESHOLD, "card_price_range": PRICE_THRESHOLD}
+REGION_LANGS = {"card_name_range": "ch", "card_price_range": "en"}
+
+
+class FakeOcr:
+    """按二值化后的区域图像查表返回识别结果的假OCR引擎, 接口与 OcrEngines 相同"""
+
+    def __init__(self):
+        self.texts: Dict[Tuple[str, tuple, bytes], Tuple[str, float]] = {}
+        self.calls: List[Tuple[str, str]] = []  # (调用方式, 语言)
+
+    def add(self, lang: str, image: np.ndarray, text: str, confidence: float = 0.99) -> None:
+        self.texts[(lang, image.shape, image.tobytes())] = (text, confidence)
+
+    def configure(self, lang: str, **options: Any) -> None:
+        pass
+
+    def warm_up(self, langs: Dict[str, bool]) -> None:
+        pass
+
+    def recognize(self, lang: str, image: np.ndarray, rec_only: bool = False,
+                  cls: bool = False) -> Optional[Tuple[str, float]]:
+        self.calls.append(("rec" if rec_only else "det_rec", lang))
+        return self._lookup(lang, image)
+
+    def recognize_batch(self, lang: str, images: List[np.ndarray]) -> List[Optional[Tuple[str, float]]]:
+        self.calls.append(("batch", lang))
+        return [self._lookup(lang, image) for image in images]
+
+    def _lookup(self, lang: str, image: np.ndarray) -> Optional[Tuple[str, float]]:
+        return self.texts.get((lang, image.shape, image.tobytes()))
+
+
+def make_config(keys: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """测试用配置: 关闭会读写真实文件的功能, 价格只由(假)OCR识别"""
+    return {
+        "config_version": 2,
+        "reference_resolution": list(SCREEN_SIZE),
+        "scale_mode": "stretch",
+        "is_loop": False,
+        "is_debug": False,
+        "ready_wait": {"enabled": True, "timeout": 0.5, "poll_interval": 0.002, "min_diff": 8.0, "stable_frames": 2},
+        "pipeline": {"enabled": True},
+        "name_match_cutoff": 1.0,
+        "log_flush_interval": 0.05,
+        "metrics": {"enabled": False},
+        "price_store": {"enabled": False},
+        "name_cache": {"enabled": False},
+        "price_change_gate": {"enabled": True, "tolerance": 0},
+        "digit_ocr": {"enabled": False, "collect_samples": False},
+        "ocr_rec_only": {"card_name_range": True, "card_price_range": True},
+        "purchase_btn_location": [0.5411, 0.3852],
+        "card_name_range": [715, 295, 141, 43],
+        "card_price_range": [956, 213, 49, 43],
+        "keys": keys,
+    }
+
+
+def make_key(name: str, position: Tuple[float, float], ideal_price: int = 100000) -> Dict[str, Any]:
+    return {"name": name, "ideal_price": ideal_price, "floating_percentage_range": 0.1,
+            "position": list(position), "want_buy": 1}
+
+
+class ScenarioFactory:
+    """生成回放场景目录, 并把场景中名称/价格区域的图像登记到假OCR"""
+
+    def __init__(self, root: Path, config: Dict[str, Any], ocr: FakeOcr):
+        self.root = root
+        self.ocr = ocr
+        self.regions = Geometry(config, SCREEN_SIZE).regions
+        self.grid = np.full((SCREEN_SIZE[1], SCREEN_SIZE[0], 3), 40, dtype=np.uint8)
+        self._seed = 0
+
+    def panel(self) -> np.ndarray:
+        """详情面板画面: 名称与价格区域填充每个场景都不同的随机图像"""
+        self._seed += 1
+        rng = np.random.default_rng(self._seed)
+        frame = self.grid.copy()
+        for left, top, width, height in self.regions.values():
+            frame[top:top + height, left:left + width] = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        return frame
+
+    def region_image(self, frame: np.ndarray, key: str) -> np.ndarray:
+        left, top, width, height = self.regions[key]
+        return binarize(frame[top:top + height, left:left + width], REGION_THRESHOLDS[key])
+
+    def make(self, name: str, card: str, buy: bool, recognized_name: Optional[str],
+             price_text: Optional[str]) -> Dict[str, Any]:
+        """recognized_name / price_text 为None时该区域识别失败"""
+        path = self.root / name
+        path.mkdir(parents=True)
+        panel = self.panel()
+        Image.fromarray(self.grid).save(path / "0.png")
+        Image.fromarray(panel).save(path / "1.png")
+        scenario = {"card": card, "buy": buy}
+        with open(path / "scenario.json", "w", encoding="utf-8") as f:
+            json.dump(scenario, f, ensure_ascii=False)
+        for key, text in (("card_name_range", recognized_name), ("card_price_range", price_text)):
+            if text is not None:
+                self.ocr.add(REGION_LANGS[key], self.region_image(panel, key), text)
+        return dict(scenario, dir=path)
+
+
+@pytest.fixture
+def fake_ocr() -> FakeOcr:
+    return FakeOcr()
+
+
+@pytest.fixture
+def bot(monkeypatch, tmp_path, fake_ocr):
+    """main模块: 使用假OCR, 日志与缓存写入临时目录"""
+    import main
+    monkeypatch.setattr(main, "ocr_engines", fake_ocr)
+    monkeypatch.setattr(main, "LOGS_FILE", tmp_path / "logs.txt")
+    monkeypatch.setattr(main, "AUDIT_FILE", tmp_path / "audit.jsonl")
+    monkeypatch.setattr(main, "NAME_CACHE_FILE", tmp_path / "name_cache.json")
+    monkeypatch.setattr(main, "METRICS_FILE", tmp_path / "metrics.json")
+    monkeypatch.setattr(main, "screen_width", SCREEN_SIZE[0])
+    monkeypatch.setattr(main, "screen_height", SCREEN_SIZE[1])
+    monkeypatch.setattr(main, "is_debug", False)
+    monkeypatch.setattr(main, "is_loop", False)
+    monkeypatch.setattr(main, "save_ocr_images", False)
+    monkeypatch.setattr(main, "capture_backend", None)
+    monkeypatch.setattr(main, "input_backend", None)
+    return main
@@ -0,0 +1,75 @@
+"""门卡定位: 搜索区域按屏幕尺寸换算, 未找到的门卡恢复为配置中的位置"""
+import numpy as np
+import pytest
+from PIL import Image
+
+from capture import CaptureBackend
+from conftest import SCREEN_SIZE, make_config, make_key
+
+ICON = 48
+
+
+class FrameCapture(CaptureBackend):
+    """返回指定画面的截图后端"""
+
+    name = "frame"
+
+    def __init__(self, frame: np.ndarray):
+        self.frame = frame
+
+    def grab(self, region):
+        left, top, width, height = region
+        return self.frame[top:top + height, left:left + width]
+
+    def size(self):
+        height, width = self.frame.shape[:2]
+        return width, height
+
+
+@pytest.fixture
+def icons(tmp_path):
+    rng = np.random.default_rng(0)
+    icons = {name: rng.integers(0, 256, (ICON, ICON, 3), dtype=np.uint8) for name in ("A", "B")}
+    for name, icon in icons.items():
+        Image.fromarray(icon).save(tmp_path / f"{name}.png")
+    return icons
+
+
+def locator_config(tmp_path, grid_region=None):
+    config = make_config([make_key("A", (0.25, 0.5)), make_key("B", (0.75, 0.5))])
+    config["card_locator"] = {"enabled": True, "templates_dir": str(tmp_path), "grid_region": grid_region,
+                              "scales": [1.0], "threshold": 0.8}
+    return config
+
+
+def screen_with(icons, placements):
+    frame = np.full((SCREEN_SIZE[1], SCREEN_SIZE[0], 3), 40, dtype=np.uint8)
+    for name, (x, y) in placements.items():
+        frame[y - ICON // 2:y + ICON // 2, x - ICON // 2:x + ICON // 2] = icons[name]
+    return frame
+
+
+def test_grid_region_is_scaled(bot, tmp_path, icons):
+    bot.screen_width, bot.screen_height = SCREEN_SIZE[0] * 2, SCREEN_SIZE[1] * 2
+    processor = bot.CardProcessor(locator_config(tmp_path, grid_region=[100, 100, 800, 400]))
+    try:
+        assert processor.locator.grid_region == (200, 200, 1600, 800)
+    finally:
+        processor.close()
+
+
+def test_missed_card_restores_configured_position(bot, tmp_path, icons):
+    processor = bot.CardProcessor(locator_config(tmp_path))
+    cards = processor.cards.cards
+    configured = dict(processor.geometry.positions)
+    try:
+        bot.capture_backend = FrameCapture(screen_with(icons, {"A": (300, 300), "B": (1500, 800)}))
+        processor.locate_cards(cards)
+        assert processor.geometry.positions == {"A": (300, 300), "B": (1500, 800)}
+
+        # B 从画面中消失: 不能继续点击上次找到的位置
+        bot.capture_backend = FrameCapture(screen_with(icons, {"A": (300, 300)}))
+        processor.locate_cards(cards)
+        assert processor.geometry.positions == {"A": (300, 300), "B": configured["B"]}
+    finally:
+        processor.close()
@@ -0,0 +1,52 @@
+"""门卡名称索引: 精确匹配, 模糊匹配与数字保护"""
+import pytest
+
+from cards import CardIndex, CardRecord, compile_cards
+
+
+def index(names, cutoff):
+    return CardIndex([CardRecord({"name": name, "ideal_price": 100000}) for name in names], fuzzy_cutoff=cutoff)
+
+
+def test_default_is_exact_match():
+    cards = compile_cards({"keys": [{"name": "Room 301 Key"}]})
+    assert cards.fuzzy_cutoff == 1.0
+    assert cards.resolve("Room301Key") is cards.cards[0]
+    assert cards.resolve("Room 301 Key") is cards.cards[0]
+    assert cards.resolve("Room301Kay") is None
+
+
+@pytest.mark.parametrize("cutoff", [1.0, 0.8, 0.5])
+def test_different_digits_never_match(cutoff):
+    cards = index(["Room 301 Key"], cutoff)
+    assert cards.resolve("Room 302 Key") is None
+    assert cards.resolve("Room302Key") is None
+    assert cards.resolve("Room30Key") is None
+    assert cards.resolve("Room3011Key") is None
+
+
+def test_fuzzy_match_with_same_digits():
+    cards = index(["Room 301 Key", "Room 302 Key"], 0.8)
+    assert cards.resolve("Room301Kay") is cards.cards[0]
+    assert cards.resolve("Rom302Key") is cards.cards[1]
+
+
+def test_fuzzy_match_without_digits():
+    cards = index(["西楼门卡", "东楼门卡"], 0.7)
+    assert cards.resolve("西搂门卡") is cards.cards[0]
+    assert cards.resolve("北区仓库") is None
+    # 识别结果带数字时不会匹配到不含数字的名称
+    assert cards.resolve("西楼1门卡") is None
+
+
+def test_resolved_results_are_remembered():
+    cards = index(["Room 301 Key"], 0.8)
+    assert cards.resolve("Room301Kay") is cards.cards[0]
+    assert cards._resolved["Room301Kay"] is cards.cards[0]
+    assert cards.resolve("Room302Key") is None
+    assert "Room302Key" in cards._resolved
+
+
+def test_duplicate_normalized_names_are_rejected():
+    with pytest.raises(ValueError):
+        compile_cards({"keys": [{"name": "Room 301 Key"}, {"name": "Room301Key"}]})
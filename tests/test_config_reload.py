@@ -0,0 +1,56 @@
+"""配置热加载: 新配置无效时保持原配置, 有效时整体替换"""
+import copy
+
+import pytest
+
+from conftest import make_config, make_key
+
+
+@pytest.fixture
+def processor(bot):
+    processor = bot.CardProcessor(make_config([make_key("Room 301 Key", (0.25, 0.5))]))
+    yield processor
+    processor.close()
+
+
+def snapshot(processor):
+    return (processor.config, processor.geometry, processor.cards, dict(processor.geometry.positions),
+            dict(processor.configured_positions), processor.price_gate_tolerance, processor.ready_wait_config)
+
+
+def broken(mutate):
+    config = make_config([make_key("Room 301 Key", (0.25, 0.5)), make_key("Room 302 Key", (0.75, 0.5))])
+    config["price_change_gate"]["tolerance"] = 3
+    mutate(config)
+    return config
+
+
+BAD_CONFIGS = {
+    "reference_resolution": lambda c: c.update(reference_resolution=[1920]),
+    "range_values": lambda c: c.update(card_name_range=["a", 295, 141, 43]),
+    "key_not_object": lambda c: c["keys"].append("Room 303 Key"),
+    "key_price_not_number": lambda c: c["keys"][0].update(ideal_price="abc"),
+    "duplicate_names": lambda c: c["keys"].append(make_key("Room301Key", (0.5, 0.5))),
+    "section_not_object": lambda c: c.update(price_change_gate=5),
+    "tolerance_not_number": lambda c: c["price_change_gate"].update(tolerance="abc"),
+}
+
+
+@pytest.mark.parametrize("name", sorted(BAD_CONFIGS))
+def test_bad_config_keeps_old_config(processor, name):
+    before = snapshot(processor)
+    old_config = copy.deepcopy(processor.config)
+    with pytest.raises(Exception):
+        processor.apply_config(broken(BAD_CONFIGS[name]))
+    after = snapshot(processor)
+    assert all(a is b or a == b for a, b in zip(before, after))
+    assert processor.config == old_config
+    assert [card.name for card in processor.cards.cards] == ["Room 301 Key"]
+
+
+def test_good_config_is_applied(processor):
+    processor.apply_config(broken(lambda c: None))
+    assert [card.name for card in processor.cards.cards] == ["Room 301 Key", "Room 302 Key"]
+    assert set(processor.geometry.positions) == {"Room 301 Key", "Room 302 Key"}
+    assert processor.configured_positions == processor.geometry.positions
+    assert processor.price_gate_tolerance == 3
@@ -0,0 +1,175 @@
+"""
+协调模式: 门卡分片与购买去重
+
+多个工作进程各自运行完整的 price_check_flow(假OCR, 回放截图, 记录型输入), 共享同一个购买记录库,
+检查每张门卡只有一个进程点击购买按钮。
+"""
+import json
+import multiprocessing
+import random
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+import replay_flow
+from cards import compile_cards
+from conftest import SCREEN_SIZE, FakeOcr, ScenarioFactory, make_config, make_key
+from coordination import SharedStore, shard_cards
+
+CARD_COUNT = 6
+WORKERS = 3
+SESSION = "test-session"
+
+
+def card_names() -> List[str]:
+    return [f"门卡{i:02d}" for i in range(CARD_COUNT)]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """每张门卡一个价格可购买的场景, 返回 (配置文件, 场景目录, 假OCR查找表)"""
+    names = card_names()
+    config = make_config([make_key(name, (0.1 + 0.1 * i, 0.5)) for i, name in enumerate(names)])
+    config_path = tmp_path / "config.json"
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False)
+    ocr = FakeOcr()
+    factory = ScenarioFactory(tmp_path / "scenarios", config, ocr)
+    dirs = {name: str(factory.make(f"s{i}", name, True, name, "90000")["dir"]) for i, name in enumerate(names)}
+    return config_path, dirs, ocr.texts
+
+
+def run_worker(config_path: str, scenario_dirs: Dict[str, str], texts: dict, store_path: str,
+               worker_id: str, names: List[str], barrier, results) -> None:
+    """工作进程: 依次对 names 中的门卡运行完整的价格检查流程"""
+    import main as bot
+    work_dir = Path(store_path).parent / worker_id
+    work_dir.mkdir()
+    ocr = FakeOcr()
+    ocr.texts = texts
+    bot.ocr_engines = ocr
+    bot.LOGS_FILE = work_dir / "logs.txt"
+    bot.AUDIT_FILE = work_dir / "audit.jsonl"
+    bot.NAME_CACHE_FILE = work_dir / "name_cache.json"
+    bot.METRICS_FILE = work_dir / "metrics.json"
+    bot.screen_width, bot.screen_height = SCREEN_SIZE
+    bot.is_debug = False
+    bot.is_loop = False
+
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    processor = bot.CardProcessor(config)
+    processor.shared_store = SharedStore(Path(store_path), SESSION)
+    processor.worker_id = worker_id
+    purchase_button = processor.geometry.purchase_button
+    barrier.wait()
+    try:
+        for name in names:
+            result = replay_flow.run_scenario(processor, {"card": name, "dir": Path(scenario_dirs[name])})
+            clicks = sum(1 for event in result["events"] if event == ("click", purchase_button))
+            results.put((worker_id, name, result["bought"], clicks))
+    finally:
+        processor.close()
+        processor.shared_store.close()
+
+
+def run_workers(corpus, store_path: Path, assignments: List[List[str]]) -> List[tuple]:
+    config_path, dirs, texts = corpus
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(len(assignments))
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=run_worker, args=(str(config_path), dirs, texts, str(store_path),
+                                             f"worker-{i}", names, barrier, results))
+        for i, names in enumerate(assignments)
+    ]
+    for process in processes:
+        process.start()
+    # 先取完结果再等待进程退出, 避免队列未取空时进程无法退出
+    records = [results.get(timeout=120) for _ in range(sum(len(names) for names in assignments))]
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+    return records
+
+
+def test_shards_cover_all_cards_once():
+    cards = compile_cards({"keys": [make_key(name, (0.5, 0.5)) for name in card_names()]}).wanted
+    shards = [shard_cards(cards, i, WORKERS) for i in range(WORKERS)]
+    names = [card.name for shard in shards for card in shard]
+    assert sorted(names) == sorted(card_names())
+    assert max(map(len, shards)) - min(map(len, shards)) <= 1
+    # 与 keys 的书写顺序无关
+    shuffled = list(cards)
+    random.Random(0).shuffle(shuffled)
+    for i, shard in enumerate(shards):
+        assert {c.name for c in shard_cards(shuffled, i, WORKERS)} == {c.name for c in shard}
+    with pytest.raises(ValueError):
+        shard_cards(cards, WORKERS, WORKERS)
+
+
+def test_workers_buy_their_own_shard(corpus, tmp_path):
+    cards = compile_cards({"keys": [make_key(name, (0.5, 0.5)) for name in card_names()]}).wanted
+    shards = [[card.name for card in shard_cards(cards, i, WORKERS)] for i in range(WORKERS)]
+    records = run_workers(corpus, tmp_path / "shared.db", shards)
+    owners = {name: f"worker-{i}" for i, shard in enumerate(shards) for name in shard}
+    assert all(bought and clicks == 1 for _, _, bought, clicks in records)
+    assert {name: worker for worker, name, _, _ in records} == owners
+
+
+def test_each_card_bought_once_across_workers(corpus, tmp_path):
+    # 每个进程以不同顺序尝试全部门卡(模拟分片重叠), 同一张门卡只能有一个进程点击购买
+    assignments = []
+    for i in range(WORKERS):
+        names = card_names()
+        random.Random(i).shuffle(names)
+        assignments.append(names)
+    store_path = tmp_path / "shared.db"
+    records = run_workers(corpus, store_path, assignments)
+
+    assert Counter(name for _, name, bought, _ in records if bought) == Counter(card_names())
+    clicks = Counter()
+    for _, name, _, count in records:
+        clicks[name] += count
+    assert clicks == Counter(card_names())
+    store = SharedStore(store_path, SESSION)
+    try:
+        assert Counter(card for _, card, _, _ in store.purchases()) == Counter(card_names())
+        assert store.purchased_cards() == set(card_names())
+    finally:
+        store.close()
+
+
+def test_claims_are_scoped_to_session(tmp_path):
+    first = SharedStore(tmp_path / "shared.db", "run-1")
+    second = SharedStore(tmp_path / "shared.db", "run-2")
+    try:
+        assert first.claim_purchase("门卡00", "a", 100)
+        assert not first.claim_purchase("门卡00", "b", 100)
+        assert second.purchased_cards() == set()
+        assert second.claim_purchase("门卡00", "a", 100)
+        assert [row[1:3] for row in first.purchases()] == [("门卡00", "a")]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_debug_mode_does_not_claim(bot, corpus, tmp_path, fake_ocr):
+    config_path, dirs, texts = corpus
+    fake_ocr.texts = texts
+    bot.is_debug = True
+    with open(config_path, "r", encoding="utf-8") as f:
+        processor = bot.CardProcessor(json.load(f))
+    store = SharedStore(tmp_path / "shared.db", SESSION)
+    processor.shared_store = store
+    try:
+        name = card_names()[0]
+        result = replay_flow.run_scenario(processor, {"card": name, "dir": Path(dirs[name])})
+        assert result["bought"]
+        assert ("click", processor.geometry.purchase_button) not in result["events"]
+        assert store.purchases() == []
+    finally:
+        processor.close()
+        store.close()
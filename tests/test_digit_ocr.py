@@ -0,0 +1,66 @@
+"""数字识别: 用合成的标注价格截图检查切分, 千位分隔符去除与低置信度回退"""
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from digit_ocr import DigitRecognizer, segment_glyphs
+from image_utils import PRICE_THRESHOLD, binarize
+
+TRAIN_PRICES = ["1,234,567", "89,012", "345,678", "901,234", "5,678,900"]
+
+
+def price_crop(text: str, font: int = cv2.FONT_HERSHEY_SIMPLEX) -> np.ndarray:
+    """逐字符渲染深色背景上的浅色价格文本(RGB), 字符间留空避免粘连"""
+    widths = [cv2.getTextSize(char, font, 0.7, 2)[0][0] for char in text]
+    image = np.full((32, sum(widths) + 3 * len(text) + 8, 3), 20, dtype=np.uint8)
+    x = 4
+    for char, width in zip(text, widths):
+        cv2.putText(image, char, (x, 24), font, 0.7, (230, 230, 230), 2, cv2.LINE_AA)
+        x += width + 3
+    return image
+
+
+@pytest.fixture(scope="module")
+def recognizer(tmp_path_factory):
+    samples_dir = tmp_path_factory.mktemp("price_samples")
+    for i, text in enumerate(TRAIN_PRICES):
+        Image.fromarray(price_crop(text)).save(samples_dir / f"{text.replace(',', '')}_{i}.png")
+    recognizer = DigitRecognizer.train(samples_dir)
+    assert recognizer is not None
+    return recognizer
+
+
+@pytest.mark.parametrize("text, count", [("4", 1), ("8,901", 4), ("12,345", 5), ("1,067,890", 7)])
+def test_separators_are_not_glyphs(text, count):
+    assert len(segment_glyphs(binarize(price_crop(text), PRICE_THRESHOLD))) == count
+
+
+@pytest.mark.parametrize("text", ["128,000", "7,654,321", "30,509", "999"])
+def test_recognizes_unseen_prices(recognizer, text):
+    price, confidence = recognizer.recognize(price_crop(text))
+    assert price == int(text.replace(",", ""))
+    assert confidence >= recognizer.min_confidence
+    # 已二值化的输入结果相同
+    assert recognizer.recognize(binarize(price_crop(text), PRICE_THRESHOLD))[0] == price
+
+
+def test_missing_digit_samples_give_no_templates(tmp_path):
+    Image.fromarray(price_crop("12,345")).save(tmp_path / "12345_0.png")
+    assert DigitRecognizer.train(tmp_path) is None
+
+
+@pytest.mark.parametrize("image", [
+    price_crop("KEY"),
+    price_crop("12,345", font=cv2.FONT_HERSHEY_SCRIPT_SIMPLEX),
+    np.random.default_rng(0).integers(0, 256, (32, 90, 3), dtype=np.uint8),
+], ids=["letters", "other_font", "noise"])
+def test_low_confidence_returns_none(recognizer, image):
+    # 置信度不足时不给出价格, 由调用方回退到PaddleOCR
+    price, confidence = recognizer.recognize(image)
+    assert price is None
+    assert confidence < recognizer.min_confidence
+
+
+def test_blank_crop_returns_none(recognizer):
+    assert recognizer.recognize(np.full((32, 90, 3), 20, dtype=np.uint8)) == (None, 0.0)
@@ -0,0 +1,36 @@
+"""图像预处理: 灰度化与二值化与原PIL两遍回调实现逐像素一致"""
+import itertools
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from image_utils import NAME_THRESHOLD, PRICE_THRESHOLD, binarize, to_gray
+
+# 全部 256^3 种RGB颜色
+ALL_COLORS = np.array(list(itertools.product(range(256), repeat=3)), dtype=np.uint8).reshape(4096, 4096, 3)
+
+
+def test_gray_matches_pil_for_every_color():
+    assert np.array_equal(to_gray(ALL_COLORS), np.asarray(Image.fromarray(ALL_COLORS).convert("L")))
+
+
+def test_gray_accepts_rgba_pil_and_sliced_input():
+    image = ALL_COLORS[:64, :96]
+    expected = np.asarray(Image.fromarray(np.ascontiguousarray(image)).convert("L"))
+    rgba = np.dstack([image, np.full(image.shape[:2], 128, dtype=np.uint8)])
+    assert np.array_equal(to_gray(rgba), expected)
+    assert np.array_equal(to_gray(Image.fromarray(rgba, mode="RGBA")), expected)
+    strided = ALL_COLORS[::64, ::64]
+    assert np.array_equal(to_gray(strided), np.asarray(Image.fromarray(np.ascontiguousarray(strided)).convert("L")))
+    assert to_gray(expected) is expected
+
+
+@pytest.mark.parametrize("threshold", [PRICE_THRESHOLD, NAME_THRESHOLD])
+def test_binarize_matches_two_pass(threshold):
+    screenshot = Image.fromarray(ALL_COLORS)
+    gray_image = screenshot.convert('L')
+    binary_image = gray_image.point(lambda p: 255 if p > threshold else 0)
+    binary_image = Image.eval(binary_image, lambda x: 255 - x)
+    assert np.array_equal(binarize(screenshot, threshold), np.asarray(binary_image))
+    assert np.array_equal(binarize(ALL_COLORS, threshold), np.asarray(binary_image))
@@ -0,0 +1,29 @@
+"""输入间隔: 只有启用就绪检测时才缩短pyautogui的输入暂停"""
+import sys
+import types
+
+import pytest
+
+from input_backend import PyAutoGuiInput
+
+
+@pytest.fixture
+def fake_pyautogui(monkeypatch):
+    module = types.SimpleNamespace(PAUSE=0.1)
+    monkeypatch.setitem(sys.modules, "pyautogui", module)
+    return module
+
+
+def test_pause_follows_ready_wait(bot, fake_pyautogui):
+    enabled = {"ready_wait": {"enabled": True, "input_pause": 0.0}}
+    disabled = {"ready_wait": {"enabled": False, "input_pause": 0.0}}
+    assert bot.input_pause(enabled) == 0.0
+    assert bot.input_pause(disabled) is None
+
+    backend = PyAutoGuiInput(pause=bot.input_pause(disabled))
+    assert fake_pyautogui.PAUSE == 0.1
+    backend.set_pause(bot.input_pause(enabled))
+    assert fake_pyautogui.PAUSE == 0.0
+    # 热加载关闭就绪检测后恢复默认间隔
+    backend.set_pause(bot.input_pause(disabled))
+    assert fake_pyautogui.PAUSE == 0.1
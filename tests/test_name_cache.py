@@ -0,0 +1,45 @@
+"""名称缓存: 只差一个数字的门卡名称不能共用缓存条目"""
+import cv2
+import numpy as np
+import pytest
+
+from image_utils import NAME_THRESHOLD, binarize
+from name_cache import NameCache
+
+
+def name_crop(text: str) -> np.ndarray:
+    """渲染与 card_name_range 同尺寸(141x43)的名称截图并二值化"""
+    image = np.full((43, 141, 3), 30, dtype=np.uint8)
+    cv2.putText(image, text, (4, 28), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (235, 235, 235), 1, cv2.LINE_AA)
+    return binarize(image, NAME_THRESHOLD)
+
+
+@pytest.mark.parametrize("cached, other", [("Room 118 Key", "Room 119 Key"), ("Room 301 Key", "Room 302 Key")])
+def test_one_digit_difference_misses(cached, other):
+    cache = NameCache()
+    cache.put(name_crop(cached), cached.replace(" ", ""))
+    assert cache.get(name_crop(other)) is None
+    assert cache.get(name_crop(cached)) == cached.replace(" ", "")
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_shape_is_part_of_the_key():
+    image = name_crop("Room 301 Key")
+    cache = NameCache()
+    cache.put(image, "Room301Key")
+    # 像素字节完全相同, 只有尺寸不同
+    assert cache.get(image.reshape(image.shape[1], image.shape[0])) is None
+
+
+def test_entries_survive_restart_in_lru_order(tmp_path):
+    path = tmp_path / "name_cache.json"
+    cache = NameCache(path, capacity=2)
+    for text in ("Room 301 Key", "Room 302 Key", "Room 303 Key"):
+        cache.put(name_crop(text), text.replace(" ", ""))
+    cache.save()
+
+    loaded = NameCache(path, capacity=2)
+    loaded.load()
+    assert loaded.get(name_crop("Room 301 Key")) is None
+    assert loaded.get(name_crop("Room 302 Key")) == "Room302Key"
+    assert loaded.get(name_crop("Room 303 Key")) == "Room303Key"
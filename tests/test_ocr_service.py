@@ -0,0 +1,65 @@
+"""OCR服务: 密钥每次安装随机生成且仅当前用户可读写, 端口上的服务密钥不同时回退到本进程识别"""
+import os
+import stat
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+
+import pytest
+
+from ocr_service import OcrClient, load_authkey
+from ocr_utils import OcrEngines
+
+
+def test_authkey_is_generated_once(tmp_path):
+    path = tmp_path / "keys" / "ocr_service.key"
+    key = load_authkey(path)
+    assert len(key) >= 32
+    assert load_authkey(path) == key
+    assert load_authkey(tmp_path / "other.key") != key
+
+
+@pytest.mark.skipif(os.name != "posix", reason="仅POSIX系统有文件权限位")
+def test_authkey_file_is_private(tmp_path):
+    path = tmp_path / "ocr_service.key"
+    load_authkey(path)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    os.chmod(path, 0o644)
+    load_authkey(path)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+
+def test_empty_authkey_file_is_rejected(tmp_path):
+    path = tmp_path / "ocr_service.key"
+    path.touch()
+    with pytest.raises(ValueError):
+        load_authkey(path)
+
+
+@pytest.fixture
+def foreign_listener():
+    """占用端口且密钥不同的服务(其他用户或旧版本)"""
+    listener = Listener(("127.0.0.1", 0), authkey=b"someone-else")
+
+    def accept() -> None:
+        try:
+            listener.accept()
+        except (AuthenticationError, OSError):
+            pass
+
+    thread = threading.Thread(target=accept, daemon=True)
+    thread.start()
+    yield listener.address
+    listener.close()
+
+
+def test_foreign_service_raises_authentication_error(foreign_listener):
+    client = OcrClient(foreign_listener, authkey=b"mine")
+    with pytest.raises(AuthenticationError):
+        client.connect_or_spawn(timeout=1.0)
+
+
+def test_foreign_service_falls_back_to_local_engines(bot, monkeypatch, foreign_listener):
+    monkeypatch.setattr(bot, "OcrClient", lambda address: OcrClient(address, authkey=b"mine"))
+    engines = bot.connect_ocr_service({"address": list(foreign_listener)})
+    assert isinstance(engines, OcrEngines)
@@ -0,0 +1,98 @@
+"""用生成的场景回放完整的 price_check_flow, 检查购买决策与记录到的点击/按键"""
+import json
+
+import pytest
+
+import replay_flow
+from conftest import SCREEN_SIZE, ScenarioFactory, make_config, make_key
+
+CARD = "东楼301钥匙卡"
+OTHER = "东楼302钥匙卡"
+CARD_POSITION = (0.25, 0.5)
+OTHER_POSITION = (0.75, 0.5)
+
+# (场景名, 识别到的名称, 识别到的价格文本, 是否应购买)
+SCENARIOS = [
+    ("buy", CARD, "105,000", True),
+    ("buy_below_ideal", CARD, "90000", True),
+    ("too_high", CARD, "120000", False),
+    ("at_max_price", CARD, "110000", False),
+    ("other_card", OTHER, "90000", False),
+    ("no_name", None, "90000", False),
+    ("no_price", CARD, None, False),
+]
+
+
+@pytest.fixture(params=[True, False], ids=["pipeline", "serial"])
+def processor_config(request, tmp_path):
+    config = make_config([make_key(CARD, CARD_POSITION), make_key(OTHER, OTHER_POSITION)])
+    config["pipeline"]["enabled"] = request.param
+    path = tmp_path / "config.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False)
+    return path
+
+
+@pytest.fixture
+def corpus(tmp_path, processor_config, fake_ocr):
+    with open(processor_config, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    factory = ScenarioFactory(tmp_path / "scenarios", config, fake_ocr)
+    for name, recognized, price, buy in SCENARIOS:
+        factory.make(name, CARD, buy, recognized, price)
+    return replay_flow.load_scenarios(tmp_path / "scenarios")
+
+
+def run_corpus(bot, processor_config, scenarios):
+    config = replay_flow.build_config(processor_config, scenarios)
+    processor = bot.CardProcessor(config)
+    try:
+        results = [replay_flow.run_scenario(processor, scenario) for scenario in scenarios]
+    finally:
+        processor.close()
+    return processor, {result["name"]: result for result in results}
+
+
+def test_decisions_match_scenarios(bot, processor_config, corpus):
+    _, results = run_corpus(bot, processor_config, corpus)
+    assert {name: r["bought"] for name, r in results.items()} == {name: r["expected"] for name, r in results.items()}
+
+
+def test_input_events(bot, processor_config, corpus):
+    processor, results = run_corpus(bot, processor_config, corpus)
+    card_position = processor.geometry.positions[CARD]
+    purchase_button = processor.geometry.purchase_button
+    for name, result in results.items():
+        clicks = [args for action, args in result["events"] if action == "click"]
+        presses = [args for action, args in result["events"] if action == "press"]
+        if result["expected"]:
+            assert clicks == [card_position, purchase_button], name
+        else:
+            assert clicks == [card_position], name
+            assert ("move", purchase_button) not in result["events"], name
+        # 每个场景只打开一次详情面板, 只按一次esc关闭
+        assert presses == ["esc"], name
+
+
+def test_debug_mode_does_not_click_purchase(bot, processor_config, corpus):
+    bot.is_debug = True
+    _, results = run_corpus(bot, processor_config, corpus)
+    assert results["buy"]["bought"]
+    clicks = [args for action, args in results["buy"]["events"] if action == "click"]
+    assert len(clicks) == 1
+
+
+def test_observations_only_for_verified_names(bot, processor_config, corpus):
+    run_corpus(bot, processor_config, corpus)
+    with open(bot.AUDIT_FILE, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    observed = sorted(r["price"] for r in records if r["type"] == "observation")
+    # other_card 与 no_name 的价格不能记到该门卡名下; 价格过高时也要等名称确认后才记录
+    assert observed == [90000, 105000, 110000, 120000]
+    assert all(r["card"] == CARD and r["recognized_name"] == CARD for r in records if r["type"] == "observation")
+    assert sorted(r["price"] for r in records if r["type"] == "purchase") == [90000, 105000]
+
+
+def test_scenarios_use_one_resolution(corpus):
+    for scenario in corpus:
+        assert replay_flow.ReplayCapture(scenario["dir"]).size() == SCREEN_SIZE
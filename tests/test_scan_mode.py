@@ -0,0 +1,31 @@
+"""扫描模式的批量识别: 仅识别模式下合并为一次批量推理, 否则逐张完整识别"""
+import pytest
+
+from conftest import ScenarioFactory, make_config, make_key
+
+CARDS = ["门卡00", "门卡01", "门卡02"]
+
+
+@pytest.mark.parametrize("name_rec_only", [True, False])
+@pytest.mark.parametrize("price_rec_only", [True, False])
+def test_read_cards_batch_respects_rec_only(bot, tmp_path, fake_ocr, name_rec_only, price_rec_only):
+    config = make_config([make_key(name, (0.1 + 0.2 * i, 0.5)) for i, name in enumerate(CARDS)])
+    config["ocr_rec_only"] = {"card_name_range": name_rec_only, "card_price_range": price_rec_only}
+    factory = ScenarioFactory(tmp_path / "scenarios", config, fake_ocr)
+    captures = []
+    for i, name in enumerate(CARDS):
+        panel = factory.panel()
+        for key, text in (("card_name_range", name), ("card_price_range", f"{90000 + i}")):
+            fake_ocr.add("ch" if key == "card_name_range" else "en", factory.region_image(panel, key), text)
+        captures.append((name, {key: panel[y:y + h, x:x + w] for key, (x, y, w, h) in factory.regions.items()}))
+
+    processor = bot.CardProcessor(config)
+    try:
+        results = processor.read_cards_batch(captures)
+    finally:
+        processor.close()
+
+    assert results == [(name, 90000 + i) for i, name in enumerate(CARDS)]
+    expected_name_calls = [("batch", "ch")] if name_rec_only else [("det_rec", "ch")] * len(CARDS)
+    expected_price_calls = [("batch", "en")] if price_rec_only else [("det_rec", "en")] * len(CARDS)
+    assert fake_ocr.calls == expected_name_calls + expected_price_calls